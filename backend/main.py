@@ -1,19 +1,57 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
+from contextlib import asynccontextmanager
 import json
 import asyncio
 import os
+import re
+import socket
+import time
+import uuid
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from services.recognizer import StreamingRecognizer
 from services.speech_stream import AzureStreamingSession
+from services.local_stream import ScriptedStreamingSession, load_script
 from services.word_matcher import WordMatcher
+from services.match_cache import LRUCache, MatchCache
+from services.reading_cursor import ReadingCursor
+from services.outbound import OutboundChannel, dumps
+from services.binary_protocol import BinaryEventEncoder, PROTOCOL_NAME as BINARY_PROTOCOL
+from services.audio_ingest import AudioIngest
+from services.vad import VoiceActivityGate
+from services.session_pool import SessionPool
+from services.session_registry import InMemorySessionRegistry, create_registry, load_resumable
+from services.reading_session import ReadingSession, ResumableSessions, passage_id
 from services.quiz_generator import QuizGenerator
-
-app = FastAPI(title="Kids Reading Recognition API")
+from services.quiz_cache import QuizCache
+from services.quiz_precompute import QuizPrecomputer
+from services.quiz_batch import QuizBatchJob
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm recognizers in the background before the first reader arrives
+    await session_pool.start()
+    heartbeat = asyncio.create_task(report_load())
+    if quiz_precompute_enabled:
+        await quiz_precomputer.start()
+    yield
+    heartbeat.cancel()
+    for task in quiz_batch_tasks.values():
+        task.cancel()
+    await asyncio.gather(*quiz_batch_tasks.values(), return_exceptions=True)
+    await quiz_precomputer.close()
+    await resumable_sessions.close()
+    await session_pool.close()
+
+
+app = FastAPI(title="Kids Reading Recognition API", lifespan=lifespan)
 
 # CORS middleware for Next.js frontend
 app.add_middleware(
@@ -29,7 +67,19 @@ print("🔧 Initializing services...")
 azure_key = os.getenv("AZURE_SPEECH_KEY", "")
 azure_region = os.getenv("AZURE_SPEECH_REGION", "")
 
-if azure_key and azure_region:
+# "azure" (default) or "local": replay scripted transcripts offline for
+# load tests and benchmarks of the matching pipeline
+speech_backend = os.getenv("SPEECH_BACKEND", "azure").lower()
+local_script = []
+
+if speech_backend == "local":
+    fixture_path = os.getenv(
+        "LOCAL_TRANSCRIPT_FIXTURE",
+        os.path.join(os.path.dirname(__file__), "fixtures", "local_transcript.json"),
+    )
+    local_script = load_script(fixture_path)
+    print(f"🧪 Local speech backend: {len(local_script)} scripted events from {fixture_path}")
+elif azure_key and azure_region:
     print(f"✅ Azure credentials found - Region: {azure_region}")
 else:
     print("❌ WARNING: Azure credentials missing!")
@@ -38,16 +88,148 @@ else:
     if not azure_region:
         print("   - AZURE_SPEECH_REGION is not set")
 
+
+def build_recognizer(loop: asyncio.AbstractEventLoop) -> StreamingRecognizer:
+    """Build an unstarted recognizer for the configured backend.
+    Blocking (Azure connection handshake); runs on the session pool's threads."""
+    if speech_backend == "local":
+        return ScriptedStreamingSession(local_script, loop=loop)
+
+    session = AzureStreamingSession(azure_key, azure_region, loop=loop, start=False)
+    session.preconnect()
+    return session
+
+
+# Pre-connected recognizers, created and torn down off the event loop
+session_pool = SessionPool(
+    build_recognizer,
+    size=int(os.getenv("SESSION_POOL_SIZE", "2")) if (speech_backend == "local" or (azure_key and azure_region)) else 0,
+    max_workers=int(os.getenv("SESSION_POOL_WORKERS", "8")),
+    max_idle_s=float(os.getenv("SESSION_POOL_MAX_IDLE_S", "120")),
+    stop_timeout_s=float(os.getenv("SESSION_STOP_TIMEOUT_S", "5")),
+)
+
+
+# Process-wide memo of token encodings and match results
+match_cache = MatchCache(maxsize=int(os.getenv("MATCH_CACHE_SIZE", "10000")))
+
 word_matcher = WordMatcher(
-    threshold=float(os.getenv("WORD_MATCH_THRESHOLD", "0.70"))
+    threshold=float(os.getenv("WORD_MATCH_THRESHOLD", "0.70")),
+    cache=match_cache,
 )
 print(f"📊 Word matching threshold: {word_matcher.threshold}")
 
+# How far past the current word a spoken word may match (skip tolerance)
+cursor_lookahead = int(os.getenv("CURSOR_LOOKAHEAD", "3"))
+cursor_skip_confidence = float(os.getenv("CURSOR_SKIP_CONFIDENCE", "0.85"))
+
+# Inbound audio aggregation and backpressure (milliseconds of PCM16 audio)
+audio_chunk_ms = int(os.getenv("AUDIO_CHUNK_MS", "100"))
+audio_buffer_ms = int(os.getenv("AUDIO_BUFFER_MS", "5000"))
+audio_high_water_ms = int(os.getenv("AUDIO_HIGH_WATER_MS", "2000"))
+
+# Voice-activity gate: drop silent audio before it reaches (and bills) Azure
+vad_enabled = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+vad_energy_db = float(os.getenv("VAD_ENERGY_DB", "-45"))
+vad_preroll_ms = int(os.getenv("VAD_PREROLL_MS", "200"))
+vad_hangover_ms = int(os.getenv("VAD_HANGOVER_MS", "300"))
+vad_keepalive_ms = int(os.getenv("VAD_KEEPALIVE_MS", "800"))
+vad_totals = {"sessions": 0, "seconds_saved": 0.0}
+
+# Clients may negotiate compact binary event frames ("protocol": "binary")
+binary_protocol_enabled = os.getenv("BINARY_PROTOCOL_ENABLED", "true").lower() in ("1", "true", "yes")
+# Passages seen by this worker by passage_id: reconnecting clients send the
+# id from "ready" instead of the whole word list
+interned_passages = LRUCache(int(os.getenv("PASSAGE_TABLE_SIZE", "256")))
+outbound_totals = {"connections": 0, "binary_connections": 0, "events": 0, "frames": 0, "bytes": 0}
+
+# Shared session state: lets a reconnecting reader land on any worker
+session_registry = create_registry(os.getenv("SESSION_REGISTRY_URL", "memory://"))
+session_state_ttl_s = float(os.getenv("SESSION_STATE_TTL_S", "3600"))
+session_save_interval_s = float(os.getenv("SESSION_SAVE_INTERVAL_S", "0.5"))
+
+# This worker's load, published for the load balancer
+worker_id = f"{socket.gethostname()}:{os.getpid()}"
+worker_max_connections = int(os.getenv("WORKER_MAX_CONNECTIONS", "0"))  # 0 = no limit
+worker_heartbeat_s = float(os.getenv("WORKER_HEARTBEAT_S", "5"))
+active_connections = 0
+
+
+async def report_load():
+    """Publish this worker's connection count to the registry periodically."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(
+                None, session_registry.report_worker,
+                worker_id, active_connections, worker_heartbeat_s * 3,
+            )
+        except Exception as e:
+            print(f"⚠️ Could not report worker load: {e}")
+        await asyncio.sleep(worker_heartbeat_s)
+
+
+# What /api/generate-quiz asks for (the precompute must match to hit the cache)
+QUIZ_NUM_QUESTIONS = 5
+QUIZ_AGE_GROUP = "11-13"
+
+# Generated quizzes keyed by passage hash: memory LRU + SQLite on disk
+quiz_cache = QuizCache(
+    path=os.getenv("QUIZ_CACHE_PATH", os.path.join(os.path.dirname(__file__), "quiz_cache.db")) or None,
+    maxsize=int(os.getenv("QUIZ_CACHE_SIZE", "256")),
+    ttl_s=float(os.getenv("QUIZ_CACHE_TTL_S", str(7 * 24 * 3600))),
+    max_disk_entries=int(os.getenv("QUIZ_CACHE_DISK_ENTRIES", "5000")),
+    variants=int(os.getenv("QUIZ_CACHE_VARIANTS", "1")),
+)
+
 quiz_generator = QuizGenerator(
     openai_api_key=os.getenv("OPENAI_API_KEY", ""),
-    anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", "")
+    anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
+    cache=quiz_cache,
+    hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+    hedge_delay_s=float(os.getenv("LLM_HEDGE_DELAY_S", "8")),
+    request_timeout_s=float(os.getenv("LLM_REQUEST_TIMEOUT_S", "60")),
+    rate_limits={
+        "openai": float(os.getenv("LLM_RATE_LIMIT_OPENAI_RPM", "0")),
+        "anthropic": float(os.getenv("LLM_RATE_LIMIT_ANTHROPIC_RPM", "0")),
+    },
+    long_text_chars=int(os.getenv("QUIZ_LONG_TEXT_CHARS", "6000")),
+    chunk_chars=int(os.getenv("QUIZ_CHUNK_CHARS", "3000")),
+)
+
+# API batch jobs: same cache and provider rate limits, but only fail over
+# instead of hedging, so bulk runs don't pay for duplicate provider calls
+quiz_batch_generator = QuizGenerator(
+    openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+    anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
+    cache=quiz_cache,
+    request_timeout_s=float(os.getenv("LLM_REQUEST_TIMEOUT_S", "60")),
+    hedging=False,
+    long_text_chars=int(os.getenv("QUIZ_LONG_TEXT_CHARS", "6000")),
+    chunk_chars=int(os.getenv("QUIZ_CHUNK_CHARS", "3000")),
+)
+quiz_batch_generator.router.limiters = quiz_generator.router.limiters
+
+# Generate the quiz while the passage is being read (needs the cache)
+quiz_precompute_enabled = (
+    os.getenv("QUIZ_PRECOMPUTE_ENABLED", "true").lower() in ("1", "true", "yes")
+    and bool(quiz_generator.openai_client or quiz_generator.anthropic_client)
+)
+quiz_precomputer = QuizPrecomputer(
+    quiz_generator,
+    max_queue=int(os.getenv("QUIZ_PRECOMPUTE_QUEUE", "100")),
+    concurrency=int(os.getenv("QUIZ_PRECOMPUTE_CONCURRENCY", "2")),
+    num_questions=QUIZ_NUM_QUESTIONS,
+    age_group=QUIZ_AGE_GROUP,
 )
 
+# Bulk pre-generation jobs started through /api/quiz-batch
+quiz_batch_concurrency = int(os.getenv("QUIZ_BATCH_CONCURRENCY", "4"))
+quiz_batch_checkpoint_dir = os.getenv("QUIZ_BATCH_CHECKPOINT_DIR", "")
+quiz_batch_jobs: Dict[str, QuizBatchJob] = {}
+quiz_batch_tasks: Dict[str, asyncio.Task] = {}
+QUIZ_BATCH_ID_RE = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
 
 class QuizRequest(BaseModel):
     text: str
@@ -58,6 +240,16 @@ class QuizResponse(BaseModel):
     questions: List[Dict[str, Any]]
 
 
+class BatchPassage(BaseModel):
+    id: str
+    text: str
+
+
+class QuizBatchRequest(BaseModel):
+    passages: List[BatchPassage]
+    job_id: Optional[str] = None
+
+
 @app.get("/")
 async def root():
     return {
@@ -65,7 +257,11 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "websocket": "/ws/recognize",
-            "quiz": "/api/generate-quiz"
+            "quiz": "/api/generate-quiz",
+            "quiz_stream": "/api/generate-quiz/stream",
+            "quiz_batch": "/api/quiz-batch",
+            "metrics": "/metrics",
+            "load": "/load"
         }
     }
 
@@ -75,6 +271,167 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/load")
+async def load():
+    """
+    Connection count of this worker, for load balancer health checks.
+    Answers 503 once the worker is at WORKER_MAX_CONNECTIONS.
+    """
+    full = 0 < worker_max_connections <= active_connections
+    return JSONResponse(
+        status_code=503 if full else 200,
+        content={
+            "worker": worker_id,
+            "connections": active_connections,
+            "max_connections": worker_max_connections,
+        },
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    workers = await asyncio.get_running_loop().run_in_executor(None, session_registry.workers)
+    return {
+        "worker": {"id": worker_id, "connections": active_connections},
+        "workers": workers,
+        "match_cache": match_cache.stats(),
+        "match_stages": word_matcher.stage_stats(),
+        "session_pool": session_pool.stats(),
+        "resumable_sessions": resumable_sessions.stats(),
+        "outbound": outbound_totals,
+        "quiz_cache": quiz_cache.stats(),
+        "quiz_generator": quiz_generator.stats(),
+        "quiz_precompute": quiz_precomputer.stats(),
+        "vad": {
+            "sessions": vad_totals["sessions"],
+            "seconds_saved": round(vad_totals["seconds_saved"], 2),
+        },
+    }
+
+
+async def save_reading(rs: ReadingSession):
+    """Write a session's progress to the shared registry (off the loop).
+    Once detached, the reader may already have continued on another
+    worker, so the write only happens while the registry still holds
+    this worker's last save (never overwrite newer progress)."""
+    state = {
+        "expected_words": rs.expected_words,
+        "current_index": rs.cursor.index if rs.cursor else 0,
+        "results": list(rs.results),
+        "resume_token": rs.resume_token,
+        "worker": worker_id,
+        "updated_at": time.time(),
+    }
+    guarded = not rs.attached
+
+    def write() -> bool:
+        if guarded:
+            stored = session_registry.load(rs.session_id)
+            if stored and (stored.get("worker") != worker_id or stored.get("updated_at", 0) > rs.saved_at):
+                return False
+        rs.saved_at = state["updated_at"]
+        session_registry.save(rs.session_id, state, session_state_ttl_s)
+        return True
+
+    try:
+        if not await asyncio.get_running_loop().run_in_executor(None, write):
+            print(f"↪️ Session {rs.session_id} continued elsewhere; not saving stale progress")
+    except Exception as e:
+        print(f"⚠️ Could not save session {rs.session_id}: {e}")
+
+
+def schedule_save(rs: ReadingSession):
+    """Coalesce progress writes to one per SESSION_SAVE_INTERVAL_S"""
+    async def save_later():
+        await asyncio.sleep(session_save_interval_s)
+        await save_reading(rs)
+
+    if rs.save_task is None or rs.save_task.done():
+        rs.save_task = asyncio.get_running_loop().create_task(save_later())
+
+
+async def stop_recognition(rs: ReadingSession, flush: bool = False) -> float:
+    """Send the buffered audio, then hand the recognizer back to the pool.
+    With flush, results for that audio are still delivered; otherwise
+    callbacks stop immediately (connection is going away).
+    Returns the seconds of silence the VAD kept away from Azure."""
+    if rs.ingest:
+        ingest, rs.ingest = rs.ingest, None
+        await ingest.aclose(drain=flush)
+    if rs.recognizer:
+        recognizer, rs.recognizer = rs.recognizer, None
+        await session_pool.release(recognizer, flush=flush)
+
+    saved = 0.0
+    if rs.vad:
+        saved = rs.vad.seconds_saved
+        vad_totals["sessions"] += 1
+        vad_totals["seconds_saved"] += saved
+        print(f"🤫 VAD skipped {saved:.1f}s of silence ({rs.vad.stats()})")
+        rs.vad = None
+    return saved
+
+
+async def release_parked(rs: ReadingSession):
+    """Grace window over without a reconnect here: free the recognizer.
+    The save is skipped if the reader resumed on another worker."""
+    print(f"⌛ Session {rs.session_id} was not resumed; releasing recognizer")
+    await stop_recognition(rs)
+    await save_reading(rs)
+
+
+# Dropped connections wait here briefly for their reader to come back
+resumable_sessions = ResumableSessions(
+    release_parked,
+    grace_s=float(os.getenv("SESSION_RESUME_GRACE_S", "30")),
+)
+
+
+def recognition_callbacks(rs: ReadingSession):
+    """Build the recognizer callbacks for a session.
+    They only touch the session, so they keep working after it is
+    reattached to a new connection."""
+
+    # Azure callbacks: map recognized text into word-by-word matches
+    async def match_tokens(tokens: List[str]):
+        """Match newly heard tokens against the expected words in order"""
+        advanced = False
+        for token_clean in tokens:
+            if rs.cursor.finished:
+                break
+
+            for event in rs.cursor.advance(token_clean):
+                if event["type"] == "word_recognized":
+                    rs.results.append([event["index"], "recognized", round(event["confidence"], 3)])
+                else:
+                    rs.results.append([event["index"], "skipped", 0.0])
+                advanced = True
+                rs.send(event)
+
+        if advanced:
+            schedule_save(rs)
+
+    async def on_partial(text: str):
+        """Called by Azure when it recognizes speech (INSTANT!)"""
+        if not rs.expected_words:
+            return
+
+        print(f"🎙️ [Partial] Azure recognized: '{text}'")
+        # Azure re-sends the whole growing phrase; only match the new tail
+        await match_tokens(rs.hypothesis.feed(text))
+
+    async def on_final(text: str):
+        """Called by Azure when it completes a phrase"""
+        print(f"✅ [Final] Azure recognized: '{text}'")
+        # Words usually turned green from partials already; match whatever
+        # the final result added or revised, then close the phrase
+        if rs.expected_words:
+            await match_tokens(rs.hypothesis.feed(text))
+        rs.hypothesis.reset()
+
+    return on_partial, on_final
+
+
 @app.websocket("/ws/recognize")
 async def websocket_recognize(websocket: WebSocket):
     """
@@ -83,9 +440,37 @@ async def websocket_recognize(websocket: WebSocket):
     Expected message format from client:
     {
         "type": "start",
-        "expectedWords": ["word1", "word2", ...]
+        "expectedWords": ["word1", "word2", ...],
+        "sessionId": "...",     (optional; continue a session, on any worker)
+        "resumeToken": "...",   (required with sessionId)
+        "protocol": "binary",   (optional; compact event frames, see
+                                 services/binary_protocol.py)
+        "passageId": "..."      (optional; instead of expectedWords, the id
+                                 from an earlier "ready")
+    }
+
+    When a passageId can't be resolved (e.g. another worker took the
+    connection and the session expired) the server answers
+    {"type": "passage_required"}; send "start" again with expectedWords.
+
+    The server answers with the id and token to send on reconnect, and the
+    word index reading continues from:
+    {
+        "type": "ready",
+        "sessionId": "...",
+        "resumeToken": "...",
+        "resumeIndex": 0,
+        "reattached": false,
+        "protocol": "json" | "binary",
+        "passageId": "...",
+        "paused": false
     }
 
+    After a dropped connection the session (and its recognizer) waits
+    SESSION_RESUME_GRACE_S seconds; a "start" with its id and token within
+    that window reattaches with "reattached": true, and word events heard
+    in between are delivered right after "ready".
+
     Or for audio data, send raw audio buffer
 
     Response format:
@@ -95,68 +480,185 @@ async def websocket_recognize(websocket: WebSocket):
         "index": 0,
         "confidence": 0.95
     }
+
+    When the reader skips ahead, every jumped-over word is reported first:
+    {
+        "type": "word_skipped",
+        "expected": "skipped_word",
+        "index": 0
+    }
+
+    Word events produced together are batched into one frame, in order:
+    {
+        "type": "words_recognized",
+        "events": [{"type": "word_recognized", ...}, ...]
+    }
+
+    When the recognizer falls behind the client should stop sending audio
+    until told to resume:
+    {
+        "type": "backpressure",
+        "paused": true
+    }
+    Backpressure changes while disconnected are not replayed; "paused" in
+    "ready" is the state to continue with.
     """
+    global active_connections
     await websocket.accept()
+    active_connections += 1
     print(f"✅ WebSocket connection accepted from {websocket.client}")
 
-    # Per-connection state
-    expected_words: List[str] = []
-    current_index = 0
-    session: AzureStreamingSession | None = None
+    # Per-connection state; the reading itself lives in a ReadingSession
+    rs: ReadingSession | None = None
+    stopped = False
     loop = asyncio.get_event_loop()
 
-    # Helper to send JSON safely
-    async def send_json(obj):
-        try:
-            await websocket.send_json(obj)
-        except Exception as e:
-            print(f"⚠️ Error sending JSON: {e}")
-
-    # Azure callbacks: map recognized text into word-by-word matches
-    async def on_partial(text: str):
-        """Called by Azure when it recognizes speech (INSTANT!)"""
-        nonlocal current_index
-        if not expected_words:
+    # Single ordered writer; word events from one tick go out as one frame
+    outbound = OutboundChannel(websocket, loop=loop)
+
+    def send_json(obj):
+        outbound.send(obj)
+
+    async def start_reading(data: Dict[str, Any]):
+        """Handle "start": reattach, restore from the registry, or begin anew"""
+        nonlocal rs
+        expected_words = [w for w in data.get("expectedWords") or [] if isinstance(w, str)]
+        passage_ref = data.get("passageId") if isinstance(data.get("passageId"), str) else None
+        if not expected_words and passage_ref:
+            expected_words = list(interned_passages.get(passage_ref) or [])
+        session_id = data.get("sessionId") or None
+        token = data.get("resumeToken")
+
+        def same_passage(words: List[str]) -> bool:
+            if expected_words:
+                return expected_words == words
+            return passage_ref is None or passage_ref == passage_id(words)
+
+        # Binary framing is chosen once per connection; the token table the
+        # client builds lives as long as the socket
+        if binary_protocol_enabled and data.get("protocol") == BINARY_PROTOCOL and outbound.encoder is None:
+            outbound.encoder = BinaryEventEncoder()
+        protocol = BINARY_PROTOCOL if outbound.encoder is not None else "json"
+
+        # Reconnect within the grace window: same cursor, same recognizer
+        parked = resumable_sessions.claim(session_id, token)
+        if parked and same_passage(parked.expected_words):
+            if rs is not None:
+                await stop_recognition(rs)
+                rs.detach()
+            rs = parked
+            print(f"🔗 Reattached session {rs.session_id} at word #{rs.cursor.index}")
+            send_json({
+                "type": "ready",
+                "message": "Ready to receive PCM16 audio",
+                "sessionId": rs.session_id,
+                "resumeToken": rs.resume_token,
+                "resumeIndex": rs.cursor.index,
+                "reattached": True,
+                "protocol": protocol,
+                "passageId": passage_id(rs.expected_words),
+                "paused": rs.paused,
+            })
+            replayed = rs.attach(outbound)
+            if replayed:
+                print(f"📬 Delivered {replayed} events heard while disconnected")
+            return
+        if parked:
+            # Different passage: the parked reading is over
+            await release_parked(parked)
+
+        # A known session id continues where the reader left off, even
+        # if it was served by another worker
+        stored = None
+        if session_id:
+            stored = await loop.run_in_executor(None, load_resumable, session_registry, session_id, token)
+        resumable = stored and same_passage(stored["expected_words"])
+        if not resumable and not expected_words and passage_ref:
+            # Passage only referenced and not known here: ask for the words
+            send_json({"type": "passage_required", "passageId": passage_ref})
             return
 
-        print(f"🎙️ [Partial] Azure recognized: '{text}'")
-        tokens = text.lower().split()
-
-        for token in tokens:
-            if current_index >= len(expected_words):
-                return
-
-            # Clean token (remove punctuation)
-            token_clean = ''.join(c for c in token if c.isalnum() or c == "'")
-            if not token_clean:
-                continue
-
-            expected_word = expected_words[current_index].lower()
-            is_match, confidence = word_matcher.match(expected_word, token_clean)
-
-            print(f"🎯 Matching '{expected_word}' vs '{token_clean}': Match={is_match}, Confidence={confidence:.2f}")
-
-            if is_match:
-                print(f"✅ Word matched! Sending recognition for word #{current_index}")
-                await send_json({
-                    "type": "word_recognized",
-                    "word": token_clean,
-                    "expected": expected_word,
-                    "index": current_index,
-                    "confidence": confidence,
-                    "partial": True
-                })
-                current_index += 1
-
-    async def on_final(text: str):
-        """Called by Azure when it completes a phrase"""
-        print(f"✅ [Final] Azure recognized: '{text}'")
-        # Process same way as partial (words turn green immediately from partial anyway)
-        await on_partial(text)
+        # (Re)create streaming session
+        if rs is not None:
+            await stop_recognition(rs)
+            rs.detach()
+
+        start_index = 0
+        if resumable:
+            rs = ReadingSession(session_id, stored["resume_token"])
+            expected_words = stored["expected_words"]
+            start_index = stored["current_index"]
+            rs.results = stored.get("results", [])
+            print(f"🔁 Resuming session {session_id} at word #{start_index}")
+        else:
+            # New session (unknown or expired id, or a different passage)
+            rs = ReadingSession(uuid.uuid4().hex)
+
+        rs.expected_words = expected_words
+        current_passage = passage_id(expected_words)
+        interned_passages.put(current_passage, expected_words)
+        # Normalize and phonetically encode the passage once per start
+        rs.cursor = ReadingCursor(
+            word_matcher,
+            word_matcher.compile_passage(expected_words),
+            lookahead=cursor_lookahead,
+            skip_confidence=cursor_skip_confidence,
+            start_index=start_index,
+        )
+        rs.attach(outbound)
+        await save_reading(rs)
+        print(f"📚 Expected words count: {len(expected_words)}")
+        if quiz_precompute_enabled:
+            # Have the quiz ready by the time the reader finishes
+            quiz_precomputer.submit(" ".join(expected_words))
+        print(f"📝 First 5 words: {expected_words[:5]}")
+
+        on_partial, on_final = recognition_callbacks(rs)
+        rs.recognizer = await session_pool.acquire(on_partial, on_final)
+        sink = rs.recognizer.push_pcm16
+        # The scripted backend's clock runs on received audio, so
+        # only gate what would be sent (and billed) to Azure
+        if vad_enabled and speech_backend == "azure":
+            rs.vad = VoiceActivityGate(
+                rs.recognizer.push_pcm16,
+                energy_threshold_db=vad_energy_db,
+                preroll_ms=vad_preroll_ms,
+                hangover_ms=vad_hangover_ms,
+                keepalive_ms=vad_keepalive_ms,
+            )
+            sink = rs.vad.process
+
+        reading = rs  # the ingest outlives this connection if it is parked
+
+        def on_pressure(paused: bool):
+            print(f"{'⏸️' if paused else '▶️'} Audio backpressure: paused={paused}")
+            reading.send({"type": "backpressure", "paused": paused})
+
+        rs.ingest = AudioIngest(
+            sink,
+            chunk_ms=audio_chunk_ms,
+            buffer_ms=audio_buffer_ms,
+            high_water_ms=audio_high_water_ms,
+            loop=loop,
+            on_pressure=on_pressure,
+        )
+        send_json({
+            "type": "ready",
+            "message": "Ready to receive PCM16 audio",
+            "sessionId": rs.session_id,
+            "resumeToken": rs.resume_token,
+            "resumeIndex": start_index,
+            "reattached": False,
+            "protocol": protocol,
+            "passageId": current_passage,
+            "paused": rs.paused,
+        })
 
     try:
         while True:
             message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
 
             # Handle text messages (control)
             if "text" in message:
@@ -164,48 +666,47 @@ async def websocket_recognize(websocket: WebSocket):
                 msg_type = data.get("type")
 
                 if msg_type == "start":
-                    expected_words = [w for w in data.get("expectedWords", []) if isinstance(w, str)]
-                    current_index = 0
-                    print(f"📚 Expected words count: {len(expected_words)}")
-                    print(f"📝 First 5 words: {expected_words[:5]}")
-
-                    # (Re)create streaming session
-                    if session:
-                        session.stop()
-                        session = None
-
-                    session = AzureStreamingSession(
-                        azure_key,
-                        azure_region,
-                        loop=loop,
-                        on_partial=on_partial,
-                        on_final=on_final,
-                    )
-                    await send_json({"type": "ready", "message": "Ready to receive PCM16 audio"})
+                    await start_reading(data)
 
                 elif msg_type == "stop":
                     print("🛑 Stop message received")
-                    if session:
-                        session.stop()
-                        session = None
-                    await send_json({"type": "stopped"})
+                    saved = await stop_recognition(rs, flush=True) if rs else 0.0
+                    send_json({"type": "stopped", "audio_seconds_saved": round(saved, 2)})
+                    stopped = True
                     break
 
             # Handle binary messages (raw PCM16 audio from AudioWorklet)
             elif "bytes" in message:
-                # Push raw PCM16 into Azure stream (continuous recognition!)
-                if session:
-                    session.push_pcm16(message["bytes"])
+                # Buffer raw PCM16; the ingest thread feeds the Azure stream
+                if rs and rs.ingest:
+                    rs.ingest.push(message["bytes"])
 
     except WebSocketDisconnect:
         print("📡 WebSocket disconnected")
     except Exception as e:
         print(f"❌ Error: {e}")
-        await send_json({"type": "error", "message": str(e)})
+        send_json({"type": "error", "message": str(e)})
     finally:
         # Cleanup
-        if session:
-            session.stop()
+        active_connections -= 1
+        if rs is not None:
+            rs.detach()
+            if rs.save_task and not rs.save_task.done():
+                rs.save_task.cancel()
+            if not stopped and rs.recognizer and not rs.cursor.finished:
+                # Connection dropped mid-reading: keep the recognizer for a
+                # quick reconnect instead of tearing it down
+                print(f"🅿️ Holding session {rs.session_id} for {resumable_sessions.grace_s:.0f}s")
+                resumable_sessions.park(rs)
+            else:
+                await stop_recognition(rs)
+            await save_reading(rs)
+        await outbound.aclose()
+        outbound_totals["connections"] += 1
+        outbound_totals["binary_connections"] += 1 if outbound.encoder is not None else 0
+        outbound_totals["events"] += outbound.events_sent
+        outbound_totals["frames"] += outbound.frames_sent
+        outbound_totals["bytes"] += outbound.bytes_sent
         try:
             await websocket.close()
         except:
@@ -220,8 +721,8 @@ async def generate_quiz(request: QuizRequest):
     try:
         questions = await quiz_generator.generate_questions(
             text=request.text,
-            num_questions=5,
-            age_group="11-13"
+            num_questions=QUIZ_NUM_QUESTIONS,
+            age_group=QUIZ_AGE_GROUP
         )
 
         return QuizResponse(questions=questions)
@@ -230,11 +731,114 @@ async def generate_quiz(request: QuizRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/generate-quiz/stream")
+async def generate_quiz_stream(request: QuizRequest):
+    """
+    Stream quiz questions as Server-Sent Events while they are generated.
+
+    Events:
+        event: question  data: {"question": ..., "options": [...], ...}
+        event: done      data: {"count": 5}
+        event: error     data: {"message": "..."}
+    """
+    async def events():
+        count = 0
+        try:
+            async for question in quiz_generator.stream_questions(
+                text=request.text,
+                num_questions=QUIZ_NUM_QUESTIONS,
+                age_group=QUIZ_AGE_GROUP
+            ):
+                count += 1
+                yield f"event: question\ndata: {dumps(question)}\n\n"
+            yield f"event: done\ndata: {dumps({'count': count})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {dumps({'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/quiz-batch", status_code=202)
+async def start_quiz_batch(request: QuizBatchRequest):
+    """
+    Pre-generate quizzes for many passages in the background.
+
+    Poll GET /api/quiz-batch/{job_id} for progress. Starting a job again
+    with the same job_id resumes it: passages that are already cached (or
+    listed in its checkpoint, with QUIZ_BATCH_CHECKPOINT_DIR set) are skipped.
+    """
+    if not (quiz_batch_generator.openai_client or quiz_batch_generator.anthropic_client):
+        raise HTTPException(status_code=503, detail="No LLM API client available")
+
+    job_id = request.job_id or uuid.uuid4().hex[:12]
+    if not QUIZ_BATCH_ID_RE.match(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job_id")
+    running = quiz_batch_tasks.get(job_id)
+    if running is not None and not running.done():
+        raise HTTPException(status_code=409, detail="Job is already running")
+
+    checkpoint = None
+    if quiz_batch_checkpoint_dir:
+        os.makedirs(quiz_batch_checkpoint_dir, exist_ok=True)
+        checkpoint = os.path.join(quiz_batch_checkpoint_dir, f"{job_id}.jsonl")
+
+    job = QuizBatchJob(
+        quiz_batch_generator,
+        [{"id": p.id, "text": p.text} for p in request.passages if p.text.strip()],
+        job_id=job_id,
+        concurrency=quiz_batch_concurrency,
+        checkpoint_path=checkpoint,
+        num_questions=QUIZ_NUM_QUESTIONS,
+        age_group=QUIZ_AGE_GROUP,
+    )
+    quiz_batch_jobs[job_id] = job
+    quiz_batch_tasks[job_id] = asyncio.create_task(job.run())
+    return job.stats()
+
+
+@app.get("/api/quiz-batch/{job_id}")
+async def quiz_batch_status(job_id: str):
+    job = quiz_batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.stats()
+
+
+@app.delete("/api/quiz-batch/{job_id}")
+async def cancel_quiz_batch(job_id: str):
+    task = quiz_batch_tasks.get(job_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return quiz_batch_jobs[job_id].stats()
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
+
+    # RUN_MODE=production: several worker processes, no reloader. Share
+    # session state between them with SESSION_REGISTRY_URL=sqlite:///...
+    # (one host) or redis://... (several hosts behind a load balancer).
+    if os.getenv("RUN_MODE", "development").lower() == "production":
+        workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+        if workers > 1 and isinstance(session_registry, InMemorySessionRegistry):
+            print("⚠️ SESSION_REGISTRY_URL is memory://; sessions won't move between workers")
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8000")),
+            workers=workers,
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True
+        )
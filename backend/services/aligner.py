@@ -0,0 +1,260 @@
+"""
+Sequence alignment of a read passage against what was recognized.
+Needleman-Wunsch over fuzzy word similarity, so a skipped or inserted word
+only affects itself instead of shifting every later comparison.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    from services.word_matcher import CompiledPassage, WordMatcher
+
+# Traceback pointers
+_DIAG = 0
+_UP = 1     # expected word with no spoken counterpart (omission)
+_LEFT = 2   # spoken word with no expected counterpart (insertion)
+
+_NEG_INF = -np.inf
+
+
+class PassageAligner:
+    def __init__(
+        self,
+        matcher: "WordMatcher",
+        band: Optional[int] = 8,
+        gap_penalty: float = 0.6,
+    ):
+        """
+        Initialize aligner.
+
+        Args:
+            matcher: WordMatcher used to score word pairs
+            band: Columns searched on either side of the guide path. The
+                  guide runs through words that occur once in both
+                  sequences, in reading order, so truncated, over-long and
+                  skipping readings follow it closely and only `band`
+                  cells around it per row are scored. Without any such
+                  word the band surrounds the diagonal, widened by the
+                  length difference. None aligns the full matrix.
+            gap_penalty: Cost of an omitted or inserted word. Pairs score
+                         their confidence when matched and confidence - 1
+                         otherwise, so two gaps (1.2) cost more than any
+                         substitution (at most 1.0).
+        """
+        self.matcher = matcher
+        self.band = band
+        self.gap_penalty = gap_penalty
+
+    def align(self, expected_words: Sequence[str], recognized_words: Sequence[str]) -> Dict:
+        """
+        Align recognized words against the expected passage.
+
+        Args:
+            expected_words: Words that should have been read
+            recognized_words: Words that were actually spoken
+
+        Returns:
+            Dictionary with per-word operations (match, substitution,
+            omission, insertion) in reading order and their counts
+        """
+        n = len(expected_words)
+        m = len(recognized_words)
+        gap = -self.gap_penalty
+
+        expected = self.matcher.compile_passage(expected_words)
+        spoken = self.matcher.compile_passage(recognized_words)
+        lows, highs = self._window(expected, spoken)
+
+        # Every in-window cell of row i lives at offsets[i] + (j - lows[i])
+        # in the flat pair and pointer arrays
+        widths = highs - lows + 1
+        offsets = np.concatenate(([0], np.cumsum(widths)[:-1])).astype(np.intp)
+        total = int(widths.sum())
+        cell_rows = np.repeat(np.arange(n + 1, dtype=np.intp), widths)
+        cell_cols = np.arange(total, dtype=np.intp) - np.repeat(offsets - lows, widths)
+
+        # Score every (expected, spoken) pair in the window in one batch;
+        # row 0 and column 0 hold no pair and can only be reached by gaps
+        border = (cell_rows == 0) | (cell_cols == 0)
+        is_match, confidence = self.matcher.match_pairs(
+            expected, spoken, np.maximum(cell_rows - 1, 0), np.maximum(cell_cols - 1, 0)
+        )
+        pair_score = np.where(is_match, confidence, confidence - 1.0)
+        pair_score[border] = _NEG_INF
+
+        # Forward pass, one vectorized row at a time, on scores shifted by
+        # the horizontal gaps: S[i][j] = H[i][j] - j * gap. Insertions then
+        # cost nothing and a row's horizontal moves are a running maximum.
+        # `shifted` holds the last row written to each column, with column
+        # j at j + 1 and -inf outside the window of the row just computed.
+        shifted = np.full(m + 2, _NEG_INF)
+        shifted[1:highs[0] + 2] = 0.0
+        pointers = np.empty(total, dtype=np.int8)
+        pointers[:widths[0]] = _LEFT
+        diag_score = pair_score - gap
+        for i in range(1, n + 1):
+            lo = int(lows[i])
+            hi = int(highs[i])
+            offset = int(offsets[i])
+            end = offset + hi - lo + 1
+
+            above = shifted[lo:hi + 2]  # columns lo - 1 .. hi
+            diag = above[:-1] + diag_score[offset:end]
+            up = above[1:] + gap
+            best = np.maximum(diag, up)
+            pointer = pointers[offset:end]
+            np.less(diag, up, out=pointer.view(bool))  # _DIAG or _UP
+
+            row = np.maximum.accumulate(best)
+            pointer[row > best] = _LEFT
+            shifted[lo + 1:hi + 2] = row
+            if lo > int(lows[i - 1]):
+                shifted[int(lows[i - 1]) + 1:lo + 1] = _NEG_INF
+
+        return self._traceback(
+            expected_words, recognized_words, lows, offsets, pointers,
+            is_match, confidence, float(shifted[m + 1] + m * gap),
+        )
+
+    def _window(self, expected: "CompiledPassage", spoken: "CompiledPassage") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Column window [lows[i], highs[i]] of every DP row. Both bounds
+        never decrease from one row to the next, and (n, m) is inside.
+        """
+        n = len(expected)
+        m = len(spoken)
+        rows = np.arange(n + 1, dtype=np.intp)
+        if self.band is None or n == 0 or m == 0:
+            return np.zeros(n + 1, dtype=np.intp), np.full(n + 1, m, dtype=np.intp)
+
+        anchor_rows, anchor_cols = _anchors(expected.normalized, spoken.normalized)
+        if len(anchor_rows) == 0:
+            # No guide: any path from (0, 0) to (n, m) needs |n - m| net
+            # gaps, so span the diagonal stretched by that difference
+            lows = np.clip(rows - max(0, n - m) - self.band, 0, m)
+            highs = np.clip(rows + max(0, m - n) + self.band, 0, m)
+            return lows, highs
+
+        # Between two consecutive anchors (and the corners) the path stays
+        # in their bounding box; an anchor's own row reaches both neighbours
+        guide_rows = np.concatenate(([0], anchor_rows, [n]))
+        guide_cols = np.concatenate(([0], anchor_cols, [m]))
+        before = np.searchsorted(guide_rows, rows, side='left') - 1
+        after = np.searchsorted(guide_rows, rows, side='right')
+        lows = guide_cols[np.maximum(before, 0)]
+        highs = guide_cols[np.minimum(after, len(guide_cols) - 1)]
+        lows = np.clip(lows - self.band, 0, m)
+        highs = np.clip(highs + self.band, 0, m)
+        return lows, highs
+
+    def _traceback(
+        self,
+        expected_words: Sequence[str],
+        recognized_words: Sequence[str],
+        lows: np.ndarray,
+        offsets: np.ndarray,
+        pointers: np.ndarray,
+        is_match: np.ndarray,
+        confidence: np.ndarray,
+        score: float,
+    ) -> Dict:
+        """
+        Walk the pointers back from the end and build the operation list.
+        """
+        operations = []
+        i = len(expected_words)
+        j = len(recognized_words)
+        while i > 0 or j > 0:
+            k = offsets[i] + j - lows[i]
+            step = pointers[k] if i > 0 else _LEFT
+            if i > 0 and j == 0:
+                step = _UP
+
+            if step == _DIAG:
+                matched = bool(is_match[k])
+                operations.append({
+                    'op': 'match' if matched else 'substitution',
+                    'expected_index': i - 1,
+                    'spoken_index': j - 1,
+                    'expected': expected_words[i - 1],
+                    'spoken': recognized_words[j - 1],
+                    'confidence': float(confidence[k]),
+                })
+                i -= 1
+                j -= 1
+            elif step == _UP:
+                operations.append({
+                    'op': 'omission',
+                    'expected_index': i - 1,
+                    'spoken_index': None,
+                    'expected': expected_words[i - 1],
+                    'spoken': None,
+                    'confidence': 0.0,
+                })
+                i -= 1
+            else:
+                operations.append({
+                    'op': 'insertion',
+                    'expected_index': None,
+                    'spoken_index': j - 1,
+                    'expected': None,
+                    'spoken': recognized_words[j - 1],
+                    'confidence': 0.0,
+                })
+                j -= 1
+
+        operations.reverse()
+
+        counts = {'match': 0, 'substitution': 0, 'omission': 0, 'insertion': 0}
+        for op in operations:
+            counts[op['op']] += 1
+
+        return {
+            'operations': operations,
+            'matches': counts['match'],
+            'substitutions': counts['substitution'],
+            'omissions': counts['omission'],
+            'insertions': counts['insertion'],
+            'score': score,
+        }
+
+
+def _anchors(expected: Sequence[str], spoken: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    DP cells (row, column) of words that occur exactly once in each
+    sequence, reduced to the longest chain that is in order in both.
+    """
+    expected_counts = Counter(expected)
+    spoken_counts = Counter(spoken)
+    spoken_at = {w: j for j, w in enumerate(spoken) if spoken_counts[w] == 1}
+    pairs = [
+        (i, spoken_at[w]) for i, w in enumerate(expected)
+        if expected_counts[w] == 1 and w in spoken_at
+    ]
+
+    # Longest increasing run of columns (rows already increase)
+    tails: List[int] = []
+    tail_index: List[int] = []
+    parent = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[pos] = j
+            tail_index[pos] = k
+        parent[k] = tail_index[pos - 1] if pos else -1
+
+    chain = []
+    k = tail_index[-1] if tail_index else -1
+    while k >= 0:
+        chain.append(pairs[k])
+        k = parent[k]
+    chain.reverse()
+    rows = np.array([i + 1 for i, _ in chain], dtype=np.intp)
+    cols = np.array([j + 1 for _, j in chain], dtype=np.intp)
+    return rows, cols
@@ -0,0 +1,192 @@
+"""
+Inbound audio stage between the websocket and the recognizer.
+Aggregates the ~20 ms PCM16 frames from the browser into larger chunks in a
+preallocated ring buffer and feeds the recognizer from a writer thread, so
+the event loop never blocks on the SDK stream.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MS = 16000 * 2 // 1000  # PCM16 mono @ 16 kHz
+
+
+class AudioIngest:
+    """Ring-buffered PCM16 ingest with a writer thread and high/low-water marks."""
+
+    def __init__(
+        self,
+        sink: Callable[[bytes], None],
+        *,
+        chunk_ms: int = 100,
+        buffer_ms: int = 5000,
+        high_water_ms: int = 2000,
+        low_water_ms: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_pressure: Optional[Callable[[bool], None]] = None,
+    ) -> None:
+        """
+        Args:
+            sink: Called from the writer thread with each aggregated chunk
+                  (e.g. AzureStreamingSession.push_pcm16)
+            chunk_ms: Audio per write to the sink
+            buffer_ms: Ring buffer capacity; frames beyond it are dropped
+            high_water_ms: Buffered audio at which the client is told to pause
+            low_water_ms: Buffered audio at which it may resume
+                          (default: half the high-water mark)
+            loop: Event loop on_pressure is called on
+            on_pressure: Called with True when crossing the high-water mark
+                         and False when draining below the low-water mark
+        """
+        self._sink = sink
+        self.chunk_bytes = max(2, chunk_ms * BYTES_PER_MS)
+        self.capacity = max(self.chunk_bytes, buffer_ms * BYTES_PER_MS)
+        self.high_water = min(self.capacity, high_water_ms * BYTES_PER_MS)
+        self.low_water = (low_water_ms * BYTES_PER_MS) if low_water_ms is not None else self.high_water // 2
+        self.loop = loop or asyncio.get_event_loop()
+        self._on_pressure = on_pressure
+
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        self._paused = False
+        self._flush = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.bytes_in = 0
+        self.bytes_written = 0
+        self.bytes_dropped = 0
+        self.chunks_written = 0
+
+        self._thread = threading.Thread(target=self._run, name="audio-ingest", daemon=True)
+        self._thread.start()
+
+    @property
+    def buffered_ms(self) -> int:
+        return self._size // BYTES_PER_MS
+
+    def push(self, data: bytes) -> bool:
+        """
+        Copy a frame into the ring buffer (non-blocking, safe on the loop).
+
+        Returns:
+            False when the frame was dropped because the buffer is full
+        """
+        n = len(data)
+        if not n:
+            return True
+
+        with self._cond:
+            if self._closed:
+                return False
+            self.bytes_in += n
+            if self._size + n > self.capacity:
+                self.bytes_dropped += n
+                return False
+
+            end = (self._start + self._size) % self.capacity
+            first = min(n, self.capacity - end)
+            src = memoryview(data)
+            self._view[end:end + first] = src[:first]
+            if n > first:
+                self._view[0:n - first] = src[first:]
+            self._size += n
+
+            if not self._paused and self._size >= self.high_water:
+                self._paused = True
+                self._notify_pressure(True)
+            if self._size >= self.chunk_bytes:
+                self._cond.notify()
+        return True
+
+    def flush(self) -> None:
+        """
+        Ask the writer to send whatever is buffered, even a partial chunk.
+        """
+        with self._cond:
+            self._flush = True
+            self._cond.notify()
+
+    def close(self, drain: bool = True) -> None:
+        """
+        Tell the writer thread to stop, sending the remaining audio first if
+        drain. Returns immediately (safe on the loop); await aclose() to
+        wait for the writer to finish.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush = drain
+            if not drain:
+                self._size = 0
+            self._cond.notify()
+
+    async def aclose(self, drain: bool = True, timeout: float = 2.0) -> None:
+        """
+        close(), then wait up to `timeout` seconds for the writer thread
+        without blocking the event loop.
+        """
+        self.close(drain)
+        await self.loop.run_in_executor(None, self._thread.join, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_written": self.bytes_written,
+            "bytes_dropped": self.bytes_dropped,
+            "chunks_written": self.chunks_written,
+            "buffered_ms": self.buffered_ms,
+        }
+
+    def _take(self, n: int) -> bytes:
+        """Remove n bytes from the head of the ring (lock held)."""
+        end = self._start + n
+        if end <= self.capacity:
+            chunk = bytes(self._view[self._start:end])
+        else:
+            chunk = bytes(self._view[self._start:]) + bytes(self._view[:end - self.capacity])
+        self._start = end % self.capacity
+        self._size -= n
+        if self._paused and self._size <= self.low_water:
+            self._paused = False
+            self._notify_pressure(False)
+        return chunk
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._size < self.chunk_bytes and not self._flush and not self._closed:
+                    self._cond.wait()
+                if self._size >= self.chunk_bytes:
+                    chunk = self._take(self.chunk_bytes)
+                elif self._size and self._flush:
+                    chunk = self._take(self._size)
+                else:
+                    chunk = None
+                    self._flush = False
+                    if self._closed:
+                        return
+            if chunk:
+                try:
+                    self._sink(chunk)
+                    self.bytes_written += len(chunk)
+                    self.chunks_written += 1
+                except Exception:
+                    logger.exception("Audio sink write failed")
+
+    def _notify_pressure(self, paused: bool) -> None:
+        if self._on_pressure is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._on_pressure, paused)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
@@ -0,0 +1,92 @@
+"""
+Compact binary framing for /ws/recognize events.
+Negotiated per connection with "protocol": "binary" in the "start" message;
+control messages (ready, stopped, error) stay JSON text frames, and so does
+any event that does not fit the format.
+
+A binary frame is a run of little-endian records with an 8 byte header:
+
+    <B kind> <B flags> <H index> <H token> <e confidence (float16)>
+
+    1 WORD_RECOGNIZED  index: word index, token: spoken-token id
+    2 WORD_SKIPPED     index: word index
+    3 BACKPRESSURE     flags bit 0: paused
+    4 TOKEN            defines spoken-token id `token`; `index` is the byte
+                       length of the UTF-8 text following the header
+
+Expected words are never echoed: the client already holds the passage it
+sent with "start" and resolves indices against it. Spoken tokens are
+interned, so each distinct token's text crosses the wire once per
+connection.
+"""
+
+from __future__ import annotations
+import struct
+from typing import Any, Dict, List, Optional
+
+PROTOCOL_NAME = "binary"
+
+WORD_RECOGNIZED = 1
+WORD_SKIPPED = 2
+BACKPRESSURE = 3
+TOKEN = 4
+
+FLAG_PAUSED = 0x01
+
+_RECORD = struct.Struct("<BBHHe")
+_MAX_U16 = 0xFFFF
+
+
+class BinaryEventEncoder:
+    """Encodes word events into binary frames; holds the connection's token table."""
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, int] = {}
+
+    def encode(self, frame: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Encode an outbound frame (a single event or a `words_recognized`
+        batch).
+
+        Returns:
+            The binary frame, or None when it has to go out as JSON
+        """
+        kind = frame.get("type")
+        events = frame["events"] if kind == "words_recognized" else [frame]
+
+        parts: List[bytes] = []
+        added: List[str] = []
+        for event in events:
+            record = self._encode_event(event, parts, added)
+            if record is None:
+                # The client never sees this frame's token definitions
+                for word in added:
+                    del self._tokens[word]
+                return None
+            parts.append(record)
+        return b"".join(parts)
+
+    def _encode_event(self, event: Dict[str, Any], parts: List[bytes], added: List[str]) -> Optional[bytes]:
+        kind = event.get("type")
+        if kind == "backpressure":
+            return _RECORD.pack(BACKPRESSURE, FLAG_PAUSED if event.get("paused") else 0, 0, 0, 0.0)
+
+        index = event.get("index", -1)
+        if not 0 <= index <= _MAX_U16:
+            return None
+        if kind == "word_skipped":
+            return _RECORD.pack(WORD_SKIPPED, 0, index, 0, 0.0)
+        if kind != "word_recognized":
+            return None
+
+        word = event.get("word", "")
+        token = self._tokens.get(word)
+        if token is None:
+            text = word.encode("utf-8")
+            if len(self._tokens) > _MAX_U16 or len(text) > _MAX_U16:
+                return None
+            token = self._tokens[word] = len(self._tokens)
+            added.append(word)
+            # Define the token right before its first use
+            parts.append(_RECORD.pack(TOKEN, 0, len(text), token, 0.0) + text)
+        return _RECORD.pack(WORD_RECOGNIZED, 0, index, token, float(event.get("confidence", 0.0)))
@@ -0,0 +1,98 @@
+"""
+Incremental tracking of Azure's growing recognition hypotheses.
+Azure re-sends the whole phrase on every `recognizing` event, so this keeps
+track of what was already consumed and hands back only the new tail.
+"""
+
+from typing import List
+import re
+
+_TOKEN_RE = re.compile(r'\S+')
+
+
+def clean_token(token: str) -> str:
+    """
+    Lowercase a raw hypothesis token and strip everything except letters,
+    digits and apostrophes.
+    """
+    return ''.join(c for c in token.lower() if c.isalnum() or c == "'")
+
+
+class HypothesisTracker:
+    def __init__(self):
+        """
+        Initialize an empty tracker for one websocket connection.
+
+        The tracker holds the current (still open) phrase only; call
+        `reset()` once Azure closes the phrase with a final result.
+        """
+        self._text = ""
+        # Raw tokens of the current phrase and their start offsets in _text
+        self._raw_tokens: List[str] = []
+        self._offsets: List[int] = []
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Consume a new hypothesis for the current phrase.
+
+        Args:
+            text: Full hypothesis text as sent by Azure
+
+        Returns:
+            Cleaned tokens that were not consumed by an earlier hypothesis,
+            in spoken order. Tokens Azure revised in place are returned again.
+        """
+        if text == self._text:
+            return []
+
+        if self._raw_tokens and text[:len(self._text)].lower() == self._text.lower():
+            # Common case: the phrase only grew (Azure may recapitalize it,
+            # e.g. in the final result). Everything before the last
+            # consumed token is stable; the last one may still be growing
+            # ("beau" -> "beautiful"), so re-tokenize from its start.
+            keep = len(self._raw_tokens) - 1
+            start = self._offsets[keep]
+            tail_tokens, tail_offsets = self._tokenize(text, start)
+            tokens = self._raw_tokens[:keep] + tail_tokens
+            offsets = self._offsets[:keep] + tail_offsets
+            first_new = keep
+        else:
+            tokens, offsets = self._tokenize(text, 0)
+            first_new = 0
+
+        # Only tokens that differ from what was consumed at the same
+        # position are new (appended, or revised by Azure). Compared
+        # cleaned: the final result adds capitals and punctuation
+        # ("the cat sat" -> "The cat sat.") without changing the words
+        old_tokens = self._raw_tokens
+        self._text = text
+        self._raw_tokens = tokens
+        self._offsets = offsets
+
+        new_tokens = []
+        for i in range(first_new, len(tokens)):
+            token_clean = clean_token(tokens[i])
+            if i < len(old_tokens) and token_clean == clean_token(old_tokens[i]):
+                continue
+            if token_clean:
+                new_tokens.append(token_clean)
+        return new_tokens
+
+    def reset(self) -> None:
+        """
+        Forget the current phrase (called when Azure finalizes it).
+        """
+        self._text = ""
+        self._raw_tokens = []
+        self._offsets = []
+
+    def _tokenize(self, text: str, start: int):
+        """
+        Split text on whitespace from `start`, keeping token start offsets.
+        """
+        tokens = []
+        offsets = []
+        for m in _TOKEN_RE.finditer(text, start):
+            tokens.append(m.group())
+            offsets.append(m.start())
+        return tokens, offsets
@@ -0,0 +1,74 @@
+"""
+Incremental JSON parsing for streamed LLM output.
+Quiz responses arrive token by token as `[{...}, {...}]` or
+`{"questions": [{...}, ...]}`; the parser yields every object that is an
+element of an array as soon as its closing brace arrives, so each question
+can be validated and sent on before the rest is generated.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalArrayParser:
+    def __init__(self):
+        """
+        Initialize an empty parser; feed it text chunks in order.
+        """
+        self._stack: List[str] = []  # open containers: '{' or '['
+        self._in_string = False
+        self._escaped = False
+        self._start: Optional[int] = None  # stack depth of the element being read
+        self._element: List[str] = []
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next piece of text.
+
+        Args:
+            chunk: Streamed text (any split, even mid-string)
+
+        Returns:
+            Array-element objects completed by this chunk, in order.
+            Elements that are not valid JSON are skipped (and counted).
+        """
+        completed: List[Dict[str, Any]] = []
+
+        for ch in chunk:
+            if self._start is not None:
+                self._element.append(ch)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if ch == '{' and self._start is None and self._stack and self._stack[-1] == '[':
+                    # An object directly inside an array: a candidate element
+                    self._start = len(self._stack)
+                    self._element = [ch]
+                self._stack.append(ch)
+            elif ch in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if ch == '}' and self._start is not None and len(self._stack) == self._start:
+                    text = ''.join(self._element)
+                    self._start = None
+                    self._element = []
+                    try:
+                        value = json.loads(text)
+                    except ValueError:
+                        self.skipped += 1
+                        continue
+                    if isinstance(value, dict):
+                        completed.append(value)
+
+        return completed
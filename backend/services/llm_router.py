@@ -0,0 +1,265 @@
+"""
+Latency-aware, hedged routing across LLM providers.
+Tracks rolling latency percentiles and error rates per provider, calls the
+currently best one, and if it has not answered by its own pN latency sends
+the same request to the next provider. The first valid answer wins and the
+other request is cancelled, which cuts the tail latency of quiz generation.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ProviderCall = Callable[..., Awaitable[Any]]
+
+
+class LatencyTracker:
+    """Rolling window of one provider's call latencies and outcomes."""
+
+    def __init__(self, window: int = 200, error_window_s: float = 300.0) -> None:
+        self._latencies: Deque[float] = deque(maxlen=window)
+        # (monotonic time, ok); errors are forgotten after error_window_s so
+        # a demoted provider gets tried again
+        self._outcomes: Deque[tuple] = deque(maxlen=window)
+        self.error_window_s = error_window_s
+        self.calls = 0
+        self.wins = 0
+        self.cancelled = 0
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        self.calls += 1
+        self._outcomes.append((time.monotonic(), ok))
+        if ok:
+            self._latencies.append(latency_s)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        since = time.monotonic() - self.error_window_s
+        recent = [ok for t, ok in self._outcomes if t >= since]
+        if not recent:
+            return 0.0
+        return 1.0 - sum(recent) / len(recent)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency (seconds) at the given percentile of successful calls."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        rank = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[rank]
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "calls": self.calls,
+            "wins": self.wins,
+            "cancelled": self.cancelled,
+            "error_rate": round(self.error_rate, 4),
+            "p50_s": round(p50, 3) if p50 is not None else None,
+            "p95_s": round(p95, 3) if p95 is not None else None,
+        }
+
+
+class RateLimiter:
+    """Token bucket: at most `per_minute` calls a minute, in bursts of `burst`."""
+
+    def __init__(self, per_minute: float, burst: int = 1) -> None:
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_s = 0.0
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock so tokens are handed out in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+                self.waited_s += wait
+                await asyncio.sleep(wait)
+
+
+class HedgedRouter:
+    """Calls the best provider and hedges to the next one when it is slow."""
+
+    def __init__(
+        self,
+        providers: Dict[str, ProviderCall],
+        *,
+        is_valid: Callable[[Any], bool],
+        hedge_percentile: float = 95.0,
+        default_hedge_delay_s: float = 8.0,
+        min_hedge_delay_s: float = 1.0,
+        timeout_s: float = 60.0,
+        min_samples: int = 10,
+        window: int = 200,
+        hedging: bool = True,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Args:
+            providers: Name -> async call, in order of preference; every
+                       call receives the same arguments
+            is_valid: Whether a result is usable (invalid ones count as errors)
+            hedge_percentile: Send the hedge once the first provider is
+                              slower than this percentile of its history
+            default_hedge_delay_s: Hedge delay until min_samples calls
+                                   have been seen
+            min_hedge_delay_s: Never hedge sooner than this
+            timeout_s: Give up on a single provider call after this long
+            min_samples: Successful calls needed before latency stats are
+                         trusted for routing and hedging
+            window: Calls kept per provider for the rolling stats
+            hedging: False to only fail over, never race two providers
+                     (for batch work, where cost matters more than tail latency)
+            rate_limits: Provider name -> calls per minute allowed; calls
+                         beyond that wait (before their latency is timed)
+        """
+        self.providers = providers
+        self.is_valid = is_valid
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay_s = default_hedge_delay_s
+        self.min_hedge_delay_s = min_hedge_delay_s
+        self.timeout_s = timeout_s
+        self.min_samples = min_samples
+        self.hedging = hedging
+        self.trackers = {name: LatencyTracker(window) for name in providers}
+        self.limiters = {
+            name: RateLimiter(per_minute)
+            for name, per_minute in (rate_limits or {}).items()
+            if name in providers and per_minute > 0
+        }
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def order(self) -> List[str]:
+        """
+        Providers from most to least promising: median latency inflated by
+        the error rate; providers without enough history keep their
+        configured place.
+        """
+        names = list(self.providers)
+
+        def score(item):
+            position, name = item
+            tracker = self.trackers[name]
+            p50 = tracker.percentile(50)
+            if tracker.samples < self.min_samples or p50 is None:
+                # Failing providers still drop back before they have history
+                return (tracker.error_rate >= 0.5, position, 0.0)
+            return (False, 0, p50 * (1.0 + 4.0 * tracker.error_rate))
+
+        return [name for _, name in sorted(enumerate(names), key=score)]
+
+    def hedge_delay(self, name: str) -> float:
+        tracker = self.trackers[name]
+        delay = None
+        if tracker.samples >= self.min_samples:
+            delay = tracker.percentile(self.hedge_percentile)
+        if delay is None:
+            delay = self.default_hedge_delay_s
+        return max(self.min_hedge_delay_s, delay)
+
+    async def call(self, *args, **kwargs) -> Any:
+        """
+        Run the request on the best provider, hedging to the next one.
+
+        Returns:
+            The first valid result, or the last invalid one when every
+            provider failed (None if they all raised)
+        """
+        order = self.order()
+        if not order:
+            raise ValueError("No LLM provider available")
+
+        running: Dict[asyncio.Task, str] = {}
+        pending_names = list(order)
+        last_result = None
+
+        def launch() -> None:
+            name = pending_names.pop(0)
+            task = asyncio.ensure_future(self._timed(name, *args, **kwargs))
+            running[task] = name
+
+        launch()
+        try:
+            while running:
+                hedge = self.hedging and pending_names and len(running) == 1
+                timeout = self.hedge_delay(order[0]) if hedge else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # First provider is slower than usual: hedge
+                    self.hedged += 1
+                    logger.info("Hedging LLM request to %s", pending_names[0])
+                    launch()
+                    continue
+
+                for task in done:
+                    name = running.pop(task)
+                    ok, result = task.result()
+                    if ok:
+                        self.trackers[name].wins += 1
+                        if name != order[0]:
+                            self.hedge_wins += 1
+                        return result
+                    last_result = result if result is not None else last_result
+
+                # Failed fast: go straight to the next provider
+                if not running and pending_names:
+                    launch()
+            return last_result
+        finally:
+            for task, name in running.items():
+                task.cancel()
+                self.trackers[name].cancelled += 1
+
+    async def throttle(self, name: str) -> None:
+        """Wait until the provider's rate limit allows another call."""
+        limiter = self.limiters.get(name)
+        if limiter is not None:
+            await limiter.acquire()
+
+    def stats(self) -> Dict[str, Any]:
+        providers = {name: tracker.stats() for name, tracker in self.trackers.items()}
+        for name, limiter in self.limiters.items():
+            providers[name]["rate_limit_wait_s"] = round(limiter.waited_s, 3)
+        return {
+            "order": self.order(),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "providers": providers,
+        }
+
+    async def _timed(self, name: str, *args, **kwargs):
+        await self.throttle(name)
+        began = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.providers[name](*args, **kwargs), self.timeout_s)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("LLM provider %s failed: %s", name, e)
+            self.trackers[name].record(time.perf_counter() - began, False)
+            return False, None
+
+        ok = self.is_valid(result)
+        self.trackers[name].record(time.perf_counter() - began, ok)
+        return ok, result
@@ -0,0 +1,131 @@
+"""
+Offline stand-in for the Azure streaming recognizer.
+Replays scripted transcripts with partial/final timing driven by the amount
+of audio pushed, so load tests and benchmarks of the matching pipeline run
+deterministically without network access or Azure quota.
+
+Fixture format (JSON):
+{
+    "segmentation_ms": 650,
+    "utterances": [
+        {"text": "Once upon a time", "start_ms": 500, "word_ms": 350},
+        {"text": "there was a young explorer", "final_text": "There was a young explorer."}
+    ]
+}
+
+`start_ms` defaults to (and is never earlier than) the previous utterance's
+final result, `word_ms` to 350. A partial is emitted per word (cumulative,
+like Azure) and the final `segmentation_ms` after the last word.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from services.recognizer import FinalCb, PartialCb, QueuedCallbacks
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MS = 16000 * 2 // 1000  # PCM16 mono @ 16 kHz
+
+# (audio time in ms, "partial" | "final", text)
+ScriptEvent = Tuple[float, str, str]
+
+
+def load_script(path: str) -> List[ScriptEvent]:
+    """
+    Load a transcript fixture and expand it into timed recognizer events.
+
+    Args:
+        path: Path to the JSON fixture
+
+    Returns:
+        Events sorted by audio time
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    return build_script(fixture)
+
+
+def build_script(fixture: Dict) -> List[ScriptEvent]:
+    """
+    Expand a parsed fixture (see module docstring) into timed events.
+    """
+    segmentation_ms = float(fixture.get("segmentation_ms", 650))
+    events: List[ScriptEvent] = []
+    clock = 0.0
+
+    for utt in fixture.get("utterances", []):
+        words = str(utt.get("text", "")).split()
+        if not words:
+            continue
+        word_ms = float(utt.get("word_ms", 350))
+        # Phrases never overlap: Azure finalizes one before the next starts
+        t = max(float(utt.get("start_ms", clock)), clock)
+
+        for i in range(len(words)):
+            t += word_ms
+            events.append((t, "partial", " ".join(words[:i + 1])))
+
+        t += segmentation_ms
+        events.append((t, "final", str(utt.get("final_text") or " ".join(words))))
+        clock = t
+
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+class ScriptedStreamingSession(QueuedCallbacks):
+    """StreamingRecognizer that replays a script against the pushed audio clock."""
+
+    def __init__(
+        self,
+        script: List[ScriptEvent],
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_partial: Optional[PartialCb] = None,
+        on_final: Optional[FinalCb] = None,
+        max_queued_events: int = 64,
+    ) -> None:
+        super().__init__(
+            loop=loop,
+            on_partial=on_partial,
+            on_final=on_final,
+            max_queued_events=max_queued_events,
+        )
+        self._script = script
+        self._next = 0
+        self._audio_bytes = 0
+        self._stopped = False
+        self._lock = threading.Lock()
+        logger.info("ScriptedStreamingSession started (%d events)", len(script))
+
+    @property
+    def audio_ms(self) -> float:
+        return self._audio_bytes / BYTES_PER_MS
+
+    def push_pcm16(self, pcm_bytes: bytes) -> None:
+        if not pcm_bytes:
+            return
+        with self._lock:
+            if self._stopped:
+                return
+            self._audio_bytes += len(pcm_bytes)
+            now = self.audio_ms
+            due = []
+            while self._next < len(self._script) and self._script[self._next][0] <= now:
+                due.append(self._script[self._next])
+                self._next += 1
+
+        for _, kind, text in due:
+            if kind == "partial":
+                self.emit_partial(text)
+            else:
+                self.emit_final(text)
+
+    def teardown(self) -> None:
+        with self._lock:
+            self._stopped = True
@@ -0,0 +1,103 @@
+"""
+Bounded LRU memo cache for word matching.
+Kids repeat the same few hundred words, so phonetic encodings and match
+results are remembered across connections instead of being recomputed.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+import threading
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 4096):
+        """
+        Initialize a thread-safe LRU cache.
+
+        Args:
+            maxsize: Maximum number of entries; least recently used entries
+                     are evicted beyond that. 0 disables caching.
+        """
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Shared by the asyncio loop and Azure SDK callback threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for key (marking it recently used) or default.
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of size and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class MatchCache:
+    def __init__(self, maxsize: int = 10000):
+        """
+        Process-wide cache shared by every WordMatcher user.
+
+        Args:
+            maxsize: Entry limit for each tier (token encodings and
+                     match results are bounded separately)
+        """
+        # normalized token -> (soundex, metaphone, match rating codex)
+        self.codes = LRUCache(maxsize)
+        # (expected, spoken, threshold) -> (is_match, confidence)
+        self.results = LRUCache(maxsize)
+
+    def clear(self) -> None:
+        self.codes.clear()
+        self.results.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'codes': self.codes.stats(),
+            'results': self.results.stats(),
+        }
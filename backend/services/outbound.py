@@ -0,0 +1,129 @@
+"""
+Ordered, coalescing outbound channel for a websocket connection.
+All sends go through one writer task, so frames never interleave, and word
+events produced in the same loop tick are sent as a single batch frame.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional, faster serialization
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Events that can be merged into one `words_recognized` frame
+BATCHABLE_TYPES = frozenset({"word_recognized", "word_skipped"})
+
+_CLOSE = object()
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize to a JSON text frame, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class OutboundChannel:
+    """Per-connection send queue drained by a single writer task."""
+
+    def __init__(self, websocket, *, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.websocket = websocket
+        self.loop = loop or asyncio.get_event_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._writer = self.loop.create_task(self._run())
+        self._closed = False
+        # Optional binary encoder (e.g. BinaryEventEncoder); returns None
+        # for frames that must stay JSON
+        self.encoder = None
+        self.events_sent = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def send(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event for sending (must be called on the event loop).
+        """
+        if not self._closed:
+            self._queue.put_nowait(event)
+
+    async def aclose(self) -> None:
+        """
+        Flush everything queued so far, then stop the writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put_nowait(_CLOSE)
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        logger.info(
+            "Outbound channel closed: %d events in %d frames, %d bytes",
+            self.events_sent, self.frames_sent, self.bytes_sent,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is _CLOSE:
+                return
+
+            # Let the rest of this tick's callbacks enqueue, then take it all
+            await asyncio.sleep(0)
+            pending: List[Any] = [first]
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            closing = _CLOSE in pending
+            events = [e for e in pending if e is not _CLOSE]
+            for frame in self._coalesce(events):
+                await self._write(frame)
+            if closing:
+                return
+
+    def _coalesce(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge runs of consecutive word events into batch frames, keeping order.
+        """
+        frames: List[Dict[str, Any]] = []
+        run: List[Dict[str, Any]] = []
+
+        def flush_run() -> None:
+            if len(run) == 1:
+                frames.append(run[0])
+            elif run:
+                frames.append({"type": "words_recognized", "events": list(run)})
+            run.clear()
+
+        for event in events:
+            if event.get("type") in BATCHABLE_TYPES:
+                run.append(event)
+            else:
+                flush_run()
+                frames.append(event)
+        flush_run()
+        return frames
+
+    async def _write(self, frame: Dict[str, Any]) -> None:
+        try:
+            data = self.encoder.encode(frame) if self.encoder is not None else None
+            if data is not None:
+                await self.websocket.send_bytes(data)
+            else:
+                data = dumps(frame)
+                await self.websocket.send_text(data)
+            self.bytes_sent += len(data)
+            self.frames_sent += 1
+            self.events_sent += len(frame["events"]) if frame.get("type") == "words_recognized" else 1
+        except Exception as e:
+            print(f"⚠️ Error sending JSON: {e}")
@@ -0,0 +1,373 @@
+"""
+Bulk quiz pre-generation for a whole text library.
+New passages used to get their quiz lazily, on the first child's visit,
+behind a cold multi-second LLM call. A batch job walks a directory or JSONL
+file of passages with a bounded pool of workers, retries failures with
+exponential backoff and writes each quiz to the persistent QuizCache. A
+JSONL checkpoint records finished passages so an interrupted run resumes
+where it stopped.
+
+Run from the backend directory:
+    python -m services.quiz_batch passages/ --concurrency 4
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from services.quiz_cache import quiz_key
+from services.quiz_generator import QuizGenerator
+
+logger = logging.getLogger(__name__)
+
+PASSAGE_EXTENSIONS = ('.txt', '.md')
+DONE_STATUSES = ('generated', 'cached')
+
+
+def load_passages(source: str) -> List[Dict[str, str]]:
+    """
+    Read passages from a directory of text files or a JSONL file.
+
+    Args:
+        source: Directory (every .txt/.md file below it is one passage, its
+                id the relative path without extension) or JSONL file with
+                one {"id": ..., "text": ...} object per line
+
+    Returns:
+        List of {"id", "text"} dicts, passages without text left out
+    """
+    passages = []
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if not name.lower().endswith(PASSAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding='utf-8') as f:
+                    text = f.read()
+                passage_id = os.path.splitext(os.path.relpath(path, source))[0]
+                passages.append({'id': passage_id.replace(os.sep, '/'), 'text': text})
+        passages.sort(key=lambda p: p['id'])
+    else:
+        with open(source, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                passage_id = record.get('id') or record.get('text_id') or str(line_no)
+                passages.append({'id': str(passage_id), 'text': record.get('text', '')})
+
+    return [p for p in passages if p['text'].strip()]
+
+
+class QuizBatchJob:
+    """Generates and caches quizzes for a list of passages."""
+
+    def __init__(
+        self,
+        generator: QuizGenerator,
+        passages: List[Dict[str, str]],
+        *,
+        job_id: Optional[str] = None,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_s: float = 2.0,
+        max_backoff_s: float = 60.0,
+        checkpoint_path: Optional[str] = None,
+        num_questions: int = 5,
+        age_group: str = "11-13",
+    ) -> None:
+        """
+        Args:
+            generator: Generator with a cache; quizzes are stored there
+            passages: {"id", "text"} dicts
+            job_id: Name shown in progress reports (random when omitted)
+            concurrency: Passages generated in parallel
+            max_retries: Extra attempts for a passage whose generation failed
+            backoff_s: Delay before the first retry, doubled (with jitter)
+                       for each further one
+            max_backoff_s: Upper bound for the retry delay
+            checkpoint_path: JSONL file recording finished passages;
+                             passages it lists as done (with unchanged
+                             text) are skipped when the job runs again
+            num_questions: Must match what /api/generate-quiz asks for
+            age_group: Must match what /api/generate-quiz asks for
+        """
+        if generator.cache is None:
+            raise ValueError("Quiz pre-generation needs a QuizGenerator with a cache")
+
+        self.generator = generator
+        self.passages = passages
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.checkpoint_path = checkpoint_path
+        self.num_questions = num_questions
+        self.age_group = age_group
+        self._checkpoint_lock = threading.Lock()
+
+        self.status = 'pending'
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.resumed = 0
+        self.generated = 0
+        self.cached = 0
+        self.failed = 0
+        self.retries = 0
+        self.errors: Dict[str, str] = {}
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Process every passage not already done; safe to call again after
+        an interruption (with the same checkpoint_path).
+
+        Returns:
+            Final stats()
+        """
+        loop = asyncio.get_running_loop()
+        self.status = 'running'
+        self.started_at = time.time()
+
+        done = {}
+        if self.checkpoint_path:
+            done = await loop.run_in_executor(None, self._read_checkpoint)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for passage in self.passages:
+            key = quiz_key(passage['text'], self.num_questions, self.age_group, self.generator.model)
+            if done.get(passage['id']) == key:
+                self.resumed += 1
+                continue
+            queue.put_nowait((passage, key))
+
+        workers = [
+            asyncio.create_task(self._work(queue), name=f"quiz-batch-{self.job_id}-{i}")
+            for i in range(min(self.concurrency, queue.qsize()))
+        ]
+        try:
+            await asyncio.gather(*workers)
+            self.status = 'done'
+        except asyncio.CancelledError:
+            self.status = 'cancelled'
+            raise
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.finished_at = time.time()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.resumed + self.generated + self.cached + self.failed
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': len(self.passages),
+            'finished': finished,
+            'resumed': self.resumed,
+            'generated': self.generated,
+            'cached': self.cached,
+            'failed': self.failed,
+            'retries': self.retries,
+            'elapsed_s': round(end - self.started_at, 1) if self.started_at else 0.0,
+            'errors': dict(list(self.errors.items())[:20]),
+        }
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            passage, key = queue.get_nowait()
+            status, attempts, error = await self._process(passage, key)
+            if status == 'generated':
+                self.generated += 1
+            elif status == 'cached':
+                self.cached += 1
+            else:
+                self.failed += 1
+                self.errors[passage['id']] = error
+                logger.warning("Quiz pre-generation failed for %s: %s", passage['id'], error)
+
+            if self.checkpoint_path:
+                record = {'id': passage['id'], 'key': key, 'status': status, 'attempts': attempts}
+                if error:
+                    record['error'] = error
+                await asyncio.get_running_loop().run_in_executor(None, self._append_checkpoint, record)
+
+    async def _process(self, passage: Dict[str, str], key: str):
+        """
+        Make sure the cache can serve passage's quiz.
+
+        Returns:
+            (status, attempts, error) with status "generated", "cached"
+            or "failed"
+        """
+        cache = self.generator.cache
+        attempts = 0
+        generated = False
+        # With several cache variants per passage, fill all of them
+        for _ in range(cache.variants):
+            if await cache.count(key) >= cache.variants:
+                break
+            ok, tries, error = await self._generate(passage['text'], key)
+            attempts += tries
+            if not ok:
+                return 'failed', attempts, error
+            generated = True
+        return ('generated' if generated else 'cached'), attempts, None
+
+    async def _generate(self, text: str, key: str):
+        """
+        Generate one quiz variant, retrying with backoff. Only a quiz that
+        actually landed in the cache counts: the generator returns (but does
+        not cache) short chunked quizzes and invalid last-resort answers.
+        """
+        cache = self.generator.cache
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                delay = min(self.max_backoff_s, self.backoff_s * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            before = await cache.count(key)
+            try:
+                questions = await self.generator.generate_questions(
+                    text=text,
+                    num_questions=self.num_questions,
+                    age_group=self.age_group,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                continue
+            if await cache.count(key) > before:
+                return True, attempt + 1, None
+            error = "no valid questions generated" if not questions else "generated quiz was incomplete or invalid"
+        return False, self.max_retries + 1, error
+
+    def _read_checkpoint(self) -> Dict[str, str]:
+        """Passage id -> quiz key of every passage the checkpoint lists as done."""
+        done: Dict[str, str] = {}
+        if not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted run
+                    continue
+                if record.get('status') in DONE_STATUSES:
+                    done[record['id']] = record['key']
+                else:
+                    done.pop(record.get('id'), None)
+        return done
+
+    def _append_checkpoint(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._checkpoint_lock:
+            with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+
+
+def _rate_limits_from_env() -> Dict[str, float]:
+    return {
+        "openai": float(os.getenv("LLM_RATE_LIMIT_OPENAI_RPM", "0")),
+        "anthropic": float(os.getenv("LLM_RATE_LIMIT_ANTHROPIC_RPM", "0")),
+    }
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from dotenv import load_dotenv
+    from services.quiz_cache import QuizCache
+
+    load_dotenv()
+    cache_path = os.getenv("QUIZ_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "quiz_cache.db"))
+    if not cache_path:
+        print("❌ QUIZ_CACHE_PATH is empty; pre-generated quizzes would not be kept")
+        return 2
+
+    cache = QuizCache(
+        path=cache_path,
+        maxsize=int(os.getenv("QUIZ_CACHE_SIZE", "256")),
+        ttl_s=float(os.getenv("QUIZ_CACHE_TTL_S", str(7 * 24 * 3600))),
+        max_disk_entries=int(os.getenv("QUIZ_CACHE_DISK_ENTRIES", "5000")),
+        variants=int(os.getenv("QUIZ_CACHE_VARIANTS", "1")),
+    )
+    generator = QuizGenerator(
+        openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
+        cache=cache,
+        request_timeout_s=float(os.getenv("LLM_REQUEST_TIMEOUT_S", "60")),
+        # Throughput over tail latency: fail over, but don't pay for races
+        hedging=args.hedge,
+        rate_limits=_rate_limits_from_env(),
+        long_text_chars=int(os.getenv("QUIZ_LONG_TEXT_CHARS", "6000")),
+        chunk_chars=int(os.getenv("QUIZ_CHUNK_CHARS", "3000")),
+    )
+
+    passages = load_passages(args.source)
+    checkpoint = args.checkpoint or args.source.rstrip('/\\') + '.checkpoint.jsonl'
+    job = QuizBatchJob(
+        generator,
+        passages,
+        job_id=os.path.basename(args.source.rstrip('/\\')),
+        concurrency=args.concurrency,
+        max_retries=args.retries,
+        backoff_s=args.backoff,
+        checkpoint_path=checkpoint,
+        num_questions=args.num_questions,
+        age_group=args.age_group,
+    )
+    print(f"📚 {len(passages)} passages from {args.source} (checkpoint: {checkpoint})")
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.progress_s)
+            s = job.stats()
+            print(f"⏳ {s['finished']}/{s['total']} done, {s['failed']} failed, {s['retries']} retries")
+
+    reporter = asyncio.create_task(report())
+    try:
+        stats = await job.run()
+    finally:
+        reporter.cancel()
+
+    print(f"✅ generated {stats['generated']}, already cached {stats['cached']}, "
+          f"resumed {stats['resumed']}, failed {stats['failed']} in {stats['elapsed_s']}s")
+    for passage_id, error in stats['errors'].items():
+        print(f"   ❌ {passage_id}: {error}")
+    return 1 if stats['failed'] else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate quizzes for a library of passages.")
+    parser.add_argument("source", help="directory of .txt/.md passages or JSONL file of {id, text}")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <source>.checkpoint.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("QUIZ_BATCH_CONCURRENCY", "4")))
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=2.0, help="first retry delay in seconds")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--age-group", default="11-13")
+    parser.add_argument("--hedge", action="store_true", help="race both providers on slow calls")
+    parser.add_argument("--progress-s", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
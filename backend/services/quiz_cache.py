@@ -0,0 +1,227 @@
+"""
+Two-tier cache of generated quizzes.
+Every child who reads the same passage used to trigger a fresh multi-second
+LLM call for identical input. Quizzes are keyed by a hash of the passage and
+generation settings, kept in an in-memory LRU and persisted to SQLite so
+they survive restarts and are shared by worker processes.
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from services.match_cache import LRUCache
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def quiz_key(text: str, num_questions: int, age_group: str, model: str) -> str:
+    """
+    Cache key for a quiz request.
+
+    Args:
+        text: The reading passage (whitespace differences are ignored)
+        num_questions: Number of questions requested
+        age_group: Target age group
+        model: Model that generates the quiz
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = _WHITESPACE_RE.sub(' ', text).strip()
+    payload = json.dumps([normalized, num_questions, age_group, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('variants', 'expires_at', 'next')
+
+    def __init__(self, variants: List[List[Dict]], expires_at: float):
+        self.variants = variants
+        self.expires_at = expires_at
+        self.next = 0
+
+
+class QuizCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        maxsize: int = 256,
+        ttl_s: float = 7 * 24 * 3600,
+        max_disk_entries: int = 5000,
+        variants: int = 1,
+    ):
+        """
+        Initialize the quiz cache.
+
+        Args:
+            path: SQLite file for the persistent tier (None = memory only)
+            maxsize: Passages kept in the in-memory LRU tier
+            ttl_s: Age after which a cached quiz is regenerated
+            max_disk_entries: Passages kept on disk; least recently used
+                              ones are evicted beyond that
+            variants: Distinct quizzes generated per passage; once all
+                      exist they are served round-robin, so classmates
+                      don't all get the same questions
+        """
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.variants = max(1, variants)
+        self._memory = LRUCache(maxsize)
+        # Round-robin counters and variant lists (never held during I/O)
+        self._lock = threading.Lock()
+        # One SQLite connection shared by executor threads
+        self._db_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS quizzes ("
+                "key TEXT NOT NULL, variant INTEGER NOT NULL, questions TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (key, variant))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS quizzes_last_used ON quizzes (last_used)")
+
+    async def get(self, key: str) -> Optional[List[Dict]]:
+        """
+        Return a cached quiz for key, or None when one should be generated
+        (not cached, expired, or fewer than `variants` exist yet).
+
+        Memory hits return without leaving the event loop; the disk tier
+        is read on an executor thread.
+        """
+        entry = self._memory.get(key)
+        if entry is not None and entry.expires_at < time.time():
+            entry = None
+        from_disk = False
+        if entry is None and self._db is not None:
+            entry = await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+            if entry is not None:
+                self._memory.put(key, entry)
+                from_disk = True
+
+        questions = self._pick(entry) if entry is not None else None
+        if questions is None:
+            self.misses += 1
+        elif from_disk:
+            self.disk_hits += 1
+        else:
+            self.memory_hits += 1
+        return questions
+
+    async def put(self, key: str, questions: List[Dict]) -> None:
+        """
+        Store a newly generated quiz as one of the passage's variants.
+        """
+        now = time.time()
+        if self._db is not None:
+            entry = self._memory.get(key)
+            if entry is None or entry.expires_at < now:
+                # Evicted from memory: continue from the variants on disk
+                # rather than starting over at variant 0 and overwriting them
+                loaded = await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+                if loaded is not None:
+                    with self._lock:
+                        current = self._memory.get(key)
+                        if current is None or current.expires_at < now:
+                            self._memory.put(key, loaded)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or entry.expires_at < now:
+                entry = _Entry([], now + self.ttl_s)
+            if len(entry.variants) >= self.variants:
+                return
+            entry.variants.append(questions)
+            variant = len(entry.variants) - 1
+        self._memory.put(key, entry)
+
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._store, key, variant, questions, now
+            )
+
+    async def count(self, key: str) -> int:
+        """
+        Unexpired variants stored for key. Unlike get() this does not
+        serve a quiz, so it neither advances the round-robin nor counts
+        as a hit or miss.
+        """
+        entry = self._memory.get(key)
+        if entry is not None and entry.expires_at < time.time():
+            entry = None
+        if entry is None and self._db is not None:
+            entry = await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+            if entry is not None:
+                self._memory.put(key, entry)
+        return len(entry.variants) if entry is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory': self._memory.stats(),
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'variants': self.variants,
+            'persistent': self._db is not None,
+        }
+
+    def _pick(self, entry: _Entry) -> Optional[List[Dict]]:
+        with self._lock:
+            if len(entry.variants) < self.variants:
+                # Still collecting variants: have the caller generate one
+                return None
+            questions = entry.variants[entry.next % len(entry.variants)]
+            entry.next += 1
+            return questions
+
+    def _load(self, key: str) -> Optional[_Entry]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT questions, created_at FROM quizzes "
+                "WHERE key = ? AND created_at >= ? ORDER BY variant",
+                (key, time.time() - self.ttl_s),
+            ).fetchall()
+            if not rows:
+                return None
+            self._db.execute("UPDATE quizzes SET last_used = ? WHERE key = ?", (time.time(), key))
+        oldest = min(created_at for _, created_at in rows)
+        return _Entry([json.loads(q) for q, _ in rows], oldest + self.ttl_s)
+
+    def _store(self, key: str, variant: int, questions: List[Dict], now: float) -> None:
+        payload = json.dumps(questions, ensure_ascii=False)
+        with self._db_lock:
+            if variant == 0:
+                # First variant of a fresh entry replaces any expired rows
+                # (unexpired ones were loaded by put() and kept)
+                self._db.execute(
+                    "DELETE FROM quizzes WHERE key = ? AND created_at < ?",
+                    (key, now - self.ttl_s),
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO quizzes (key, variant, questions, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, variant, payload, now, now),
+            )
+            self._db.execute("DELETE FROM quizzes WHERE created_at < ?", (now - self.ttl_s,))
+            self._db.execute(
+                "DELETE FROM quizzes WHERE key IN ("
+                "SELECT key FROM quizzes GROUP BY key "
+                "ORDER BY MAX(last_used) DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
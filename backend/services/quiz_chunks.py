@@ -0,0 +1,140 @@
+"""
+Map-reduce helpers for quizzes on chapter-length passages.
+A single prompt with the whole chapter makes generation time grow with the
+text. Long passages are split into paragraph-aligned chunks of similar
+size, questions are generated per chunk concurrently, and the candidates are
+deduplicated and picked so the quiz covers the whole passage.
+"""
+
+import math
+import re
+from typing import Dict, List, Tuple
+
+from rapidfuzz import fuzz
+
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Question stems at least this similar (0-100) count as duplicates
+DUPLICATE_THRESHOLD = 85
+
+
+def _pieces(text: str, max_chars: int) -> List[Tuple[str, bool]]:
+    """
+    (piece, starts_paragraph) pairs: whole paragraphs, or the sentences of
+    a paragraph longer than max_chars.
+    """
+    pieces = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append((paragraph, True))
+            continue
+        for i, sentence in enumerate(_SENTENCE_RE.split(paragraph)):
+            pieces.append((sentence, i == 0))
+    return pieces
+
+
+def _join(pieces: List[Tuple[str, bool]]) -> str:
+    text = ''
+    for piece, starts_paragraph in pieces:
+        if text:
+            text += '\n\n' if starts_paragraph else ' '
+        text += piece
+    return text
+
+
+def split_passage(text: str, max_chars: int) -> List[str]:
+    """
+    Split a passage into paragraph-aligned chunks of similar length.
+
+    Chunks are packed towards len(text) / n (the fewest chunks that fit
+    max_chars) rather than filled up to max_chars, so the longest chunk,
+    which bounds the time to quiz, stays as short as possible. Paragraphs
+    longer than max_chars are cut between sentences.
+
+    Args:
+        text: The reading passage (paragraphs separated by blank lines)
+        max_chars: Upper bound for a chunk, unless a single sentence is longer
+
+    Returns:
+        Chunks in passage order; [text] when it already fits
+    """
+    pieces = _pieces(text, max_chars)
+    total = sum(len(piece) + 2 for piece, _ in pieces)
+    if total <= max_chars or len(pieces) <= 1:
+        return [_join(pieces)] if pieces else []
+
+    target = total / math.ceil(total / max_chars)
+    chunks: List[str] = []
+    current: List[Tuple[str, bool]] = []
+    size = 0
+    for piece, starts_paragraph in pieces:
+        # Close the chunk when adding the piece overshoots the target by
+        # more than stopping short of it would undershoot
+        if current and (size + len(piece) > max_chars or size + len(piece) / 2 > target):
+            chunks.append(_join(current))
+            current, size = [], 0
+        current.append((piece, starts_paragraph))
+        size += len(piece) + 2
+    if current:
+        chunks.append(_join(current))
+    return chunks
+
+
+def questions_per_chunk(num_questions: int, num_chunks: int) -> int:
+    """Candidates to ask for per chunk: half again the share, for selection."""
+    return max(2, min(num_questions, math.ceil(num_questions * 1.5 / num_chunks)))
+
+
+def select_questions(candidates: List[List[Dict]], num_questions: int) -> List[Dict]:
+    """
+    Pick the quiz from per-chunk candidate questions.
+
+    Drops malformed candidates (no string stem) and near-duplicate question
+    stems, then takes questions round-robin
+    across chunks (evenly spaced ones when there are more chunks than
+    questions) so every part of the passage is asked about, and returns
+    them in passage order.
+
+    Args:
+        candidates: Valid questions per chunk, chunks in passage order
+        num_questions: Questions wanted
+
+    Returns:
+        Up to num_questions questions
+    """
+    seen: List[str] = []
+    unique: List[List[Dict]] = []
+    for chunk_questions in candidates:
+        kept = []
+        for question in chunk_questions:
+            stem = question.get('question') if isinstance(question, dict) else None
+            if not isinstance(stem, str) or not stem.strip():
+                continue
+            stem = stem.strip().lower()
+            if any(fuzz.token_sort_ratio(stem, other) >= DUPLICATE_THRESHOLD for other in seen):
+                continue
+            seen.append(stem)
+            kept.append(question)
+        unique.append(kept)
+
+    picked: List[tuple] = []
+    depth = 0
+    while len(picked) < num_questions:
+        chunks = [c for c, chunk_questions in enumerate(unique) if depth < len(chunk_questions)]
+        if not chunks:
+            break
+        wanted = num_questions - len(picked)
+        if len(chunks) > wanted:
+            # Fewer slots than chunks: spread them evenly over the passage
+            step = len(chunks) / wanted
+            chunks = [chunks[int(i * step + step / 2)] for i in range(wanted)]
+        for chunk in chunks:
+            picked.append((chunk, depth, unique[chunk][depth]))
+        depth += 1
+
+    picked.sort(key=lambda item: (item[0], item[1]))
+    return [question for _, _, question in picked]
@@ -3,23 +3,71 @@ Quiz Generation Service using LLM APIs (OpenAI or Anthropic).
 Generates age-appropriate comprehension questions for 11-13 year olds.
 """
 
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional
+from contextlib import aclosing
+import asyncio
 import json
+import time
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
+from services.quiz_cache import QuizCache, quiz_key
+from services.llm_router import HedgedRouter
+from services.json_stream import IncrementalArrayParser
+from services.quiz_chunks import questions_per_chunk, select_questions, split_passage
+
+OPENAI_MODEL = "gpt-4o"
+ANTHROPIC_MODEL = "claude-3-5-sonnet-20241022"
+
 
 class QuizGenerator:
-    def __init__(self, openai_api_key: str = "", anthropic_api_key: str = ""):
+    def __init__(
+        self,
+        openai_api_key: str = "",
+        anthropic_api_key: str = "",
+        cache: Optional[QuizCache] = None,
+        hedge_percentile: float = 95.0,
+        hedge_delay_s: float = 8.0,
+        request_timeout_s: float = 60.0,
+        hedging: bool = True,
+        rate_limits: Optional[Dict[str, float]] = None,
+        long_text_chars: int = 6000,
+        chunk_chars: int = 3000
+    ):
         """
         Initialize Quiz Generator with API keys.
 
         Args:
             openai_api_key: OpenAI API key
             anthropic_api_key: Anthropic API key
+            cache: Optional QuizCache; identical requests are answered
+                   from it instead of calling the LLM again
+            hedge_percentile: With both keys set, ask the second provider
+                              too once the first is slower than this
+                              percentile of its recent latencies
+            hedge_delay_s: Hedge delay before enough latencies are known
+            request_timeout_s: Give up on a single provider call after this
+            hedging: False to only fail over to the other provider
+            rate_limits: Calls per minute allowed per provider
+                         ("openai", "anthropic"); unset = unlimited
+            long_text_chars: Passages longer than this are split into
+                             chunks quizzed concurrently (0 = never)
+            chunk_chars: Upper bound for one chunk of a long passage
         """
         self.openai_client = None
         self.anthropic_client = None
+        self.cache = cache
+        self.long_text_chars = long_text_chars
+        self.chunk_chars = max(500, chunk_chars)
+
+        # key -> task generating (or streaming) that quiz; concurrent
+        # identical requests await the same task instead of each calling
+        # the LLM
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.llm_calls = 0
+        self.collapsed = 0
+        self.chunked = 0
 
         if openai_api_key:
             self.openai_client = AsyncOpenAI(api_key=openai_api_key)
@@ -30,6 +78,31 @@ class QuizGenerator:
         if not self.openai_client and not self.anthropic_client:
             print("Warning: No LLM API keys provided. Quiz generation will not work.")
 
+        # OpenAI first by default; the router reorders by observed latency
+        # and error rate, and hedges slow calls to the other provider
+        providers = {}
+        if self.openai_client:
+            providers["openai"] = self._generate_with_openai
+        if self.anthropic_client:
+            providers["anthropic"] = self._generate_with_anthropic
+        self.router = HedgedRouter(
+            providers,
+            is_valid=lambda questions: bool(questions) and self.validate_questions(questions),
+            hedge_percentile=hedge_percentile,
+            default_hedge_delay_s=hedge_delay_s,
+            timeout_s=request_timeout_s,
+            hedging=hedging,
+            rate_limits=rate_limits,
+        )
+
+    @property
+    def model(self) -> str:
+        """
+        Preferred model, used in the cache key. Quizzes answered by the
+        other provider (hedged or failed over) are cached under it as well.
+        """
+        return OPENAI_MODEL if self.openai_client else ANTHROPIC_MODEL
+
     async def generate_questions(
         self,
         text: str,
@@ -53,22 +126,229 @@ class QuizGenerator:
                 "explanation": str
             }
         """
-        # Try OpenAI first (GPT-4o), fall back to Anthropic
-        if self.openai_client:
-            return await self._generate_with_openai(text, num_questions, age_group)
-        elif self.anthropic_client:
-            return await self._generate_with_anthropic(text, num_questions, age_group)
+        key = quiz_key(text, num_questions, age_group, self.model)
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_and_cache(key, text, num_questions, age_group))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._finish_flight(key, t))
         else:
+            self.collapsed += 1
+
+        self._waiters[key] += 1
+        try:
+            # Shielded: one caller giving up doesn't cancel the others
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1 and self.cache is None:
+                # Last interested caller left and nothing would keep the result
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters:
+                self._waiters[key] -= 1
+
+    async def stream_questions(
+        self,
+        text: str,
+        num_questions: int = 5,
+        age_group: str = "11-13"
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield comprehension questions one by one as the LLM writes them.
+
+        Uses the providers' streaming APIs; each question is validated on
+        its own as soon as its JSON object closes. Cached quizzes, and ones
+        already being generated for an identical request, are yielded from
+        there instead.
+
+        Args:
+            text: The reading passage
+            num_questions: Number of questions to generate
+            age_group: Target age group (default: "11-13")
+        """
+        key = quiz_key(text, num_questions, age_group, self.model)
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                for question in cached:
+                    yield question
+                return
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            for question in await asyncio.shield(task):
+                yield question
+            return
+
+        if not self.router.providers:
             raise ValueError("No LLM API client available")
 
-    async def _generate_with_openai(
+        if self._is_long(text):
+            # Chunks are generated concurrently; nothing to stream per question
+            for question in await self.generate_questions(text, num_questions, age_group):
+                yield question
+            return
+
+        # Registered like generate_questions' flights, so identical requests
+        # (streamed or not) join this one; the queue hands its questions
+        # to this caller as they arrive
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(self._stream_and_cache(key, text, num_questions, age_group, queue))
+        self._inflight[key] = task
+        self._waiters[key] = 1
+        task.add_done_callback(lambda t: self._finish_flight(key, t))
+        task.add_done_callback(lambda t: queue.put_nowait(None))
+        try:
+            while True:
+                question = await queue.get()
+                if question is None:
+                    break
+                yield question
+        finally:
+            if not task.done() and self._waiters.get(key) == 1 and self.cache is None:
+                # Streaming caller left and nothing would keep the result
+                task.cancel()
+            if key in self._waiters:
+                self._waiters[key] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        LLM calls made vs. requests that joined an identical in-flight call.
+        """
+        return {
+            "llm_calls": self.llm_calls,
+            "collapsed": self.collapsed,
+            "chunked": self.chunked,
+            "in_flight": len(self._inflight),
+            "routing": self.router.stats(),
+        }
+
+    async def _generate_and_cache(
         self,
+        key: str,
         text: str,
         num_questions: int,
         age_group: str
     ) -> List[Dict]:
         """
-        Generate questions using OpenAI GPT-4o.
+        Make the LLM call for one key and store a usable result in the cache.
+        """
+        if not self.router.providers:
+            raise ValueError("No LLM API client available")
+
+        if self._is_long(text):
+            questions = await self._generate_from_chunks(text, num_questions, age_group)
+            # A failed chunk leaves the quiz short; generate it again next time
+            complete = len(questions) == num_questions
+        else:
+            self.llm_calls += 1
+            questions = await self.router.call(text, num_questions, age_group) or []
+            complete = True
+
+        # Failed generations come back empty; only keep usable quizzes
+        if self.cache is not None and complete and questions and self.validate_questions(questions):
+            await self.cache.put(key, questions)
+        return questions
+
+    async def _stream_and_cache(
+        self,
+        key: str,
+        text: str,
+        num_questions: int,
+        age_group: str,
+        queue: asyncio.Queue
+    ) -> List[Dict]:
+        """
+        Stream one quiz from the best provider, putting each valid question
+        on the queue as soon as it arrives, and store a complete quiz in the
+        cache. Each provider's stream is timed into the router's trackers.
+        """
+        streams = {"openai": self._stream_with_openai, "anthropic": self._stream_with_anthropic}
+        questions: List[Dict] = []
+        self.llm_calls += 1
+        for name in self.router.order():
+            tracker = self.router.trackers[name]
+            await self.router.throttle(name)
+            began = time.perf_counter()
+            try:
+                async with aclosing(streams[name](text, num_questions, age_group)) as stream:
+                    async for question in stream:
+                        if not self.validate_questions([question]):
+                            print(f"Skipping malformed streamed question: {question}")
+                            continue
+                        questions.append(question)
+                        queue.put_nowait(question)
+                        if len(questions) >= num_questions:
+                            break
+            except asyncio.CancelledError:
+                tracker.cancelled += 1
+                raise
+            except Exception as e:
+                print(f"Error streaming questions with {name}: {e}")
+
+            ok = len(questions) == num_questions
+            tracker.record(time.perf_counter() - began, ok)
+            if ok:
+                tracker.wins += 1
+            if questions:
+                # Can't switch providers halfway through a quiz
+                break
+
+        if self.cache is not None and len(questions) == num_questions:
+            await self.cache.put(key, questions)
+        return questions
+
+    def _is_long(self, text: str) -> bool:
+        return 0 < self.long_text_chars < len(text)
+
+    async def _generate_from_chunks(
+        self,
+        text: str,
+        num_questions: int,
+        age_group: str
+    ) -> List[Dict]:
+        """
+        Map-reduce generation for long passages: candidate questions for
+        every chunk concurrently, then a local dedup/selection pass, so the
+        time to quiz follows the longest chunk rather than the whole text.
+        """
+        chunks = split_passage(text, self.chunk_chars)
+        per_chunk = questions_per_chunk(num_questions, len(chunks))
+        self.chunked += 1
+        self.llm_calls += len(chunks)
+
+        results = await asyncio.gather(
+            *(self.router.call(chunk, per_chunk, age_group) for chunk in chunks),
+            return_exceptions=True
+        )
+        candidates = []
+        for result in results:
+            if isinstance(result, BaseException) or not result:
+                candidates.append([])
+                continue
+            candidates.append([q for q in result if self.validate_questions([q])])
+
+        return select_questions(candidates, num_questions)
+
+    def _finish_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the error retrieved even if every caller went away
+            task.exception()
+
+    def _openai_messages(self, text: str, num_questions: int, age_group: str) -> List[Dict]:
+        """
+        Chat messages asking GPT-4o for the quiz as JSON.
         """
         system_prompt = f"""You are an educational content creator specializing in reading comprehension for children aged {age_group}.
 Generate {num_questions} multiple-choice questions that test understanding of the given text.
@@ -97,13 +377,58 @@ Return the response as a JSON array with this exact structure:
 
 Generate {num_questions} comprehension questions."""
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _anthropic_prompt(self, text: str, num_questions: int, age_group: str) -> str:
+        """
+        Prompt asking Claude for the quiz as a JSON array.
+        """
+        prompt = f"""You are an educational content creator specializing in reading comprehension for children aged {age_group}.
+
+Text:
+{text}
+
+Generate {num_questions} multiple-choice questions that test understanding of this text.
+
+Requirements:
+- Questions appropriate for {age_group} year olds
+- Mix of literal comprehension and inferential questions
+- 4 answer options per question
+- Only one correct answer
+- Plausible but clearly incorrect distractors
+- Clear, simple language
+- Brief explanation for correct answer
+
+Return ONLY a valid JSON array with this structure:
+[
+  {{
+    "question": "What is the main idea?",
+    "options": ["Option A", "Option B", "Option C", "Option D"],
+    "correct_answer": 0,
+    "explanation": "Brief explanation"
+  }}
+]"""
+
+        return prompt
+
+    async def _generate_with_openai(
+        self,
+        text: str,
+        num_questions: int,
+        age_group: str
+    ) -> List[Dict]:
+        """
+        Generate questions using OpenAI GPT-4o.
+        """
+        messages = self._openai_messages(text, num_questions, age_group)
+
         try:
             response = await self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                model=OPENAI_MODEL,
+                messages=messages,
                 response_format={"type": "json_object"},
                 temperature=0.7
             )
@@ -132,6 +457,31 @@ Generate {num_questions} comprehension questions."""
             print(f"Error generating questions with OpenAI: {e}")
             return []
 
+    async def _stream_with_openai(
+        self,
+        text: str,
+        num_questions: int,
+        age_group: str
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream questions from OpenAI GPT-4o.
+        """
+        parser = IncrementalArrayParser()
+        stream = await self.openai_client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=self._openai_messages(text, num_questions, age_group),
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                for question in parser.feed(delta):
+                    yield question
+
     async def _generate_with_anthropic(
         self,
         text: str,
@@ -141,35 +491,11 @@ Generate {num_questions} comprehension questions."""
         """
         Generate questions using Anthropic Claude.
         """
-        prompt = f"""You are an educational content creator specializing in reading comprehension for children aged {age_group}.
-
-Text:
-{text}
-
-Generate {num_questions} multiple-choice questions that test understanding of this text.
-
-Requirements:
-- Questions appropriate for {age_group} year olds
-- Mix of literal comprehension and inferential questions
-- 4 answer options per question
-- Only one correct answer
-- Plausible but clearly incorrect distractors
-- Clear, simple language
-- Brief explanation for correct answer
-
-Return ONLY a valid JSON array with this structure:
-[
-  {{
-    "question": "What is the main idea?",
-    "options": ["Option A", "Option B", "Option C", "Option D"],
-    "correct_answer": 0,
-    "explanation": "Brief explanation"
-  }}
-]"""
+        prompt = self._anthropic_prompt(text, num_questions, age_group)
 
         try:
             response = await self.anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model=ANTHROPIC_MODEL,
                 max_tokens=2000,
                 temperature=0.7,
                 messages=[
@@ -195,6 +521,28 @@ Return ONLY a valid JSON array with this structure:
             print(f"Error generating questions with Anthropic: {e}")
             return []
 
+    async def _stream_with_anthropic(
+        self,
+        text: str,
+        num_questions: int,
+        age_group: str
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream questions from Anthropic Claude.
+        """
+        parser = IncrementalArrayParser()
+        async with self.anthropic_client.messages.stream(
+            model=ANTHROPIC_MODEL,
+            max_tokens=2000,
+            temperature=0.7,
+            messages=[
+                {"role": "user", "content": self._anthropic_prompt(text, num_questions, age_group)}
+            ]
+        ) as stream:
+            async for delta in stream.text_stream:
+                for question in parser.feed(delta):
+                    yield question
+
     def validate_questions(self, questions: List[Dict]) -> bool:
         """
         Validate that questions have the correct structure.
@@ -203,7 +551,7 @@ Return ONLY a valid JSON array with this structure:
 
         for q in questions:
             # Check required keys
-            if not all(key in q for key in required_keys):
+            if not isinstance(q, dict) or not all(key in q for key in required_keys):
                 return False
 
             # Check options is a list of 4 items
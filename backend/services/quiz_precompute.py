@@ -0,0 +1,123 @@
+"""
+Background quiz generation for passages that are being read.
+The websocket "start" message already carries the whole passage, so the
+quiz can be generated while the child reads instead of after. Results land
+in the QuizGenerator's cache (or its in-flight map), where
+/api/generate-quiz picks them up.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Any, Dict, List, Set
+
+from services.quiz_cache import quiz_key
+from services.quiz_generator import QuizGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class QuizPrecomputer:
+    """Bounded queue of passages drained by a fixed number of workers."""
+
+    def __init__(
+        self,
+        generator: QuizGenerator,
+        *,
+        max_queue: int = 100,
+        concurrency: int = 2,
+        num_questions: int = 5,
+        age_group: str = "11-13",
+    ) -> None:
+        """
+        Args:
+            generator: Generator whose cache the results warm
+            max_queue: Passages waiting at most; later ones are dropped
+                       (the quiz is then generated on request as before)
+            concurrency: LLM calls made in parallel by the precompute workers
+            num_questions: Must match what /api/generate-quiz asks for
+            age_group: Must match what /api/generate-quiz asks for
+        """
+        self.generator = generator
+        self.concurrency = max(1, concurrency)
+        self.num_questions = num_questions
+        self.age_group = age_group
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self._pending: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"quiz-precompute-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, text: str) -> bool:
+        """
+        Queue a passage for quiz generation (non-blocking, call on the loop).
+
+        Returns:
+            False when it was not queued (already pending, or queue full)
+        """
+        text = text.strip()
+        if not text or not self._workers:
+            return False
+        key = quiz_key(text, self.num_questions, self.age_group, self.generator.model)
+        if key in self._pending:
+            self.deduplicated += 1
+            return False
+        try:
+            self._queue.put_nowait((key, text))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Quiz precompute queue full; dropping passage")
+            return False
+        self._pending.add(key)
+        self.submitted += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            key, text = await self._queue.get()
+            try:
+                # Cache hit, joins an in-flight request, or makes the call
+                questions = await self.generator.generate_questions(
+                    text=text,
+                    num_questions=self.num_questions,
+                    age_group=self.age_group,
+                )
+                if questions:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Quiz precompute failed: %s", e)
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
@@ -0,0 +1,102 @@
+"""
+Live reading cursor for the websocket matcher.
+Tracks the next expected word and tolerates skipped or dropped words by
+looking a few words ahead, so one missed word doesn't stall the session.
+"""
+
+import logging
+from typing import Dict, List
+
+from services.word_matcher import CompiledPassage, WordMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class ReadingCursor:
+    def __init__(
+        self,
+        matcher: WordMatcher,
+        passage: CompiledPassage,
+        lookahead: int = 3,
+        skip_confidence: float = 0.85,
+        start_index: int = 0,
+    ):
+        """
+        Initialize cursor over a compiled passage.
+
+        Args:
+            matcher: WordMatcher used for scoring
+            passage: Expected words, precompiled once per "start"
+            lookahead: How many words past the current one a spoken token
+                       may match (0 = strict, in-order only)
+            skip_confidence: Minimum confidence needed to jump ahead, so
+                             short common words don't trigger false skips
+            start_index: Index of the first word still to be read
+        """
+        self.matcher = matcher
+        self.passage = passage
+        self.lookahead = max(0, lookahead)
+        self.skip_confidence = skip_confidence
+        self.index = start_index
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.passage)
+
+    def advance(self, token: str) -> List[Dict]:
+        """
+        Match one spoken (cleaned) token and move the cursor.
+
+        Args:
+            token: Cleaned token heard from the recognizer
+
+        Returns:
+            Events to send to the client: a `word_skipped` event for every
+            jumped-over word followed by the `word_recognized` event, or an
+            empty list when the token matched nothing in the window
+        """
+        if self.finished:
+            return []
+
+        expected_word = self.passage.words[self.index].lower()
+        is_match, confidence = self.matcher.match_compiled(self.passage, self.index, token)
+
+        logger.debug("Matching %r vs %r: match=%s, confidence=%.2f", expected_word, token, is_match, confidence)
+
+        if is_match:
+            return [self._recognized(token, confidence)]
+
+        # Kid skipped a word (or Azure dropped one): look a few words ahead
+        end = min(len(self.passage), self.index + 1 + self.lookahead)
+        for ahead in range(self.index + 1, end):
+            is_match, confidence = self.matcher.match_compiled(self.passage, ahead, token)
+            if is_match and confidence >= self.skip_confidence:
+                logger.debug("Jumping from word #%d to #%d on %r", self.index, ahead, token)
+                events = []
+                while self.index < ahead:
+                    events.append({
+                        "type": "word_skipped",
+                        "expected": self.passage.words[self.index].lower(),
+                        "index": self.index,
+                    })
+                    self.index += 1
+                events.append(self._recognized(token, confidence))
+                return events
+
+        return []
+
+    def _recognized(self, token: str, confidence: float) -> Dict:
+        """
+        Build the recognition event for the current word and step past it.
+        """
+        logger.debug("Word #%d matched", self.index)
+        event = {
+            "type": "word_recognized",
+            "word": token,
+            "expected": self.passage.words[self.index].lower(),
+            "index": self.index,
+            "confidence": confidence,
+            "partial": True
+        }
+        self.index += 1
+        return event
@@ -0,0 +1,184 @@
+"""
+Reading sessions that survive a dropped websocket.
+A ReadingSession owns everything a reader needs between connections: the
+cursor, phrase tracker, results and the live recognizer with its audio
+pipeline. When the connection drops the session is parked for a grace
+window; a reconnect presenting the session id and resume token reattaches
+to it and keeps the same recognizer, with no new handshake.
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from services.hypothesis_tracker import HypothesisTracker
+from services.session_registry import tokens_match
+
+logger = logging.getLogger(__name__)
+
+
+def passage_id(words: List[str]) -> str:
+    """
+    Stable id of a passage, so a reconnecting client can refer to the
+    passage the server already has instead of sending every word again.
+    """
+    payload = json.dumps(words, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class ReadingSession:
+    """Per-reader state that outlives a single websocket connection."""
+
+    def __init__(self, session_id: str, resume_token: Optional[str] = None, max_pending: int = 512) -> None:
+        """
+        Args:
+            session_id: Id the client sends back on reconnect
+            resume_token: Secret proving the reconnecting client owns the
+                          session (generated when not given)
+            max_pending: Events kept for the client while disconnected
+        """
+        self.session_id = session_id
+        self.resume_token = resume_token or secrets.token_urlsafe(16)
+
+        self.expected_words: List[str] = []
+        self.cursor = None
+        self.hypothesis = HypothesisTracker()
+        self.results: List[list] = []
+
+        # Live recognition pipeline (StreamingRecognizer, AudioIngest, VAD)
+        self.recognizer = None
+        self.ingest = None
+        self.vad = None
+        self.save_task: Optional[asyncio.Task] = None
+        # updated_at of this worker's last registry write
+        self.saved_at = 0.0
+
+        self._outbound = None
+        self._pending: Deque[Dict[str, Any]] = deque(maxlen=max_pending)
+        # Last backpressure state; stale pause/resume events aren't queued
+        # while detached, so "ready" tells a reattaching client instead
+        self.paused = False
+
+    @property
+    def attached(self) -> bool:
+        return self._outbound is not None
+
+    def check_token(self, token: Optional[str]) -> bool:
+        return tokens_match(self.resume_token, token)
+
+    def attach(self, outbound) -> int:
+        """
+        Route events to a connection's OutboundChannel, first replaying
+        what was produced while detached.
+
+        Returns:
+            Number of replayed events
+        """
+        self._outbound = outbound
+        replayed = len(self._pending)
+        while self._pending:
+            outbound.send(self._pending.popleft())
+        return replayed
+
+    def detach(self) -> None:
+        self._outbound = None
+
+    def send(self, event: Dict[str, Any]) -> None:
+        """Send to the attached client, or hold it until one reattaches."""
+        if event.get("type") == "backpressure":
+            self.paused = bool(event.get("paused"))
+        if self._outbound is not None:
+            self._outbound.send(event)
+        elif event.get("type") != "backpressure":
+            self._pending.append(event)
+
+
+class ResumableSessions:
+    """Parks detached ReadingSessions for a grace window."""
+
+    def __init__(
+        self,
+        on_expire: Callable[[ReadingSession], Awaitable[None]],
+        *,
+        grace_s: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            on_expire: Releases a session nobody reclaimed in time
+                       (stops its recognizer)
+            grace_s: How long a dropped session waits for its client
+        """
+        self._on_expire = on_expire
+        self.grace_s = grace_s
+        self._parked: Dict[str, tuple] = {}
+
+        self.parked_total = 0
+        self.resumed = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def park(self, session: ReadingSession) -> None:
+        """Hold a detached session until it is claimed or the window ends."""
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self.grace_s, self._expire, session.session_id)
+        self._parked[session.session_id] = (session, timer, time.monotonic())
+        self.parked_total += 1
+        logger.info("Parked session %s for %.0fs", session.session_id, self.grace_s)
+
+    def claim(self, session_id: Optional[str], token: Optional[str]) -> Optional[ReadingSession]:
+        """
+        Take back a parked session.
+
+        Returns:
+            The session, or None when it is not parked here (expired, held
+            by another worker) or the token does not match
+        """
+        entry = self._parked.get(session_id) if session_id else None
+        if entry is None:
+            return None
+        session, timer, _ = entry
+        if not session.check_token(token):
+            self.rejected += 1
+            return None
+
+        del self._parked[session_id]
+        timer.cancel()
+        self.resumed += 1
+        return session
+
+    async def close(self) -> None:
+        """Release every parked session (shutdown)."""
+        parked = list(self._parked.values())
+        self._parked.clear()
+        for session, timer, _ in parked:
+            timer.cancel()
+            await self._release(session)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "parked": len(self._parked),
+            "parked_total": self.parked_total,
+            "resumed": self.resumed,
+            "expired": self.expired,
+            "rejected_tokens": self.rejected,
+            "grace_s": self.grace_s,
+        }
+
+    def _expire(self, session_id: str) -> None:
+        entry = self._parked.pop(session_id, None)
+        if entry is None:
+            return
+        self.expired += 1
+        asyncio.get_running_loop().create_task(self._release(entry[0]))
+
+    async def _release(self, session: ReadingSession) -> None:
+        try:
+            await self._on_expire(session)
+        except Exception:
+            logger.exception("Releasing parked session %s failed", session.session_id)
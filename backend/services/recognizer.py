@@ -0,0 +1,237 @@
+"""
+Backend-neutral streaming recognizer interface.
+The websocket pipeline only needs to push PCM16 audio, receive partial and
+final hypotheses, and stop; Azure and the offline scripted backend both
+implement this.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Optional, Protocol, runtime_checkable
+
+logger = logging.getLogger(__name__)
+
+PartialCb = Callable[[str], Awaitable[None]]
+FinalCb = Callable[[str], Awaitable[None]]
+
+_PARTIAL = "partial"
+_FINAL = "final"
+
+
+@runtime_checkable
+class StreamingRecognizer(Protocol):
+    """Continuous recognizer fed with raw PCM16 mono 16 kHz audio.
+
+    Implementations invoke the partial/final callbacks on their event loop.
+    Callbacks can be given at construction or bound later, which lets a
+    session pool create and connect recognizers before they are needed.
+    """
+
+    def bind_callbacks(self, on_partial: Optional[PartialCb], on_final: Optional[FinalCb]) -> None:
+        """Attach handlers (call on the loop)."""
+        ...
+
+    def start(self) -> None:
+        """Begin recognizing (blocking)."""
+        ...
+
+    def push_pcm16(self, pcm_bytes: bytes) -> None:
+        """Append audio; may be called from a non-loop thread."""
+        ...
+
+    def close_callbacks(self) -> None:
+        """Stop delivering events (call on the loop)."""
+        ...
+
+    def teardown(self) -> None:
+        """Release backend resources (blocking)."""
+        ...
+
+    def stop(self) -> None:
+        """Stop recognizing and release resources."""
+        ...
+
+    async def aclose(self, *, executor=None, timeout: float = 5.0, flush: bool = False) -> bool:
+        """Stop without blocking the loop; no callbacks fire once it returns."""
+        ...
+
+
+class QueuedCallbacks:
+    """Delivers recognizer events to async callbacks through one consumer task.
+
+    Backends call `emit_partial` / `emit_final` from any thread; events are
+    handed to the loop and the handlers run strictly in order. Partials are
+    cumulative, so only the newest queued one is kept.
+    """
+
+    def __init__(
+        self,
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_partial: Optional[PartialCb] = None,
+        on_final: Optional[FinalCb] = None,
+        max_queued_events: int = 64,
+    ) -> None:
+        self.loop = loop or asyncio.get_event_loop()
+        self._on_partial: Optional[PartialCb] = None
+        self._on_final: Optional[FinalCb] = None
+
+        self._events: asyncio.Queue = asyncio.Queue(maxsize=max_queued_events)
+        # Mutable [text] slot of the partial still waiting in the queue
+        self._partial_slot: Optional[list] = None
+        self.dropped_partials = 0
+        self.dropped_finals = 0
+        self._consumer: Optional[asyncio.Task] = None
+        self._closed = False
+
+        if on_partial or on_final:
+            self.bind_callbacks(on_partial, on_final)
+
+    def bind_callbacks(self, on_partial: Optional[PartialCb], on_final: Optional[FinalCb]) -> None:
+        """Attach handlers and start delivering events (call on the loop).
+
+        Lets a recognizer be created ahead of time, e.g. by a session pool
+        on a worker thread, and handed to a connection later.
+        """
+        self._on_partial = on_partial
+        self._on_final = on_final
+        if self._consumer is None:
+            self._consumer = self.loop.create_task(self._consume())
+
+    def start(self) -> None:
+        """Begin recognizing (blocking; backends override as needed)."""
+
+    def teardown(self) -> None:
+        """Release backend resources (blocking; safe off the loop)."""
+
+    def stop(self) -> None:
+        """Stop delivering events and release resources."""
+        self.close_callbacks()
+        self.teardown()
+
+    async def aclose(
+        self,
+        *,
+        executor: Optional[Executor] = None,
+        timeout: float = 5.0,
+        flush: bool = False,
+    ) -> bool:
+        """
+        Stop recognizing without blocking the event loop.
+
+        The blocking teardown runs in `executor` and is abandoned after
+        `timeout` seconds. Once this returns no handler is running and none
+        will be called again.
+
+        Args:
+            executor: Where to run teardown (default: the loop's executor)
+            timeout: Seconds to wait for the backend to stop
+            flush: Deliver results the backend produces while stopping
+                   (e.g. the final phrase of the drained audio) before
+                   detaching the handlers; False drops them right away
+
+        Returns:
+            False when the teardown failed or timed out
+        """
+        if not flush:
+            await self._close_consumer()
+
+        ok = True
+        try:
+            await asyncio.wait_for(self.loop.run_in_executor(executor, self.teardown), timeout)
+        except asyncio.TimeoutError:
+            ok = False
+            logger.warning("%s teardown timed out after %.1fs", type(self).__name__, timeout)
+        except Exception:
+            ok = False
+            logger.exception("%s teardown failed", type(self).__name__)
+
+        if flush and ok and self._consumer is not None:
+            # Let results scheduled by the backend threads reach the queue
+            await asyncio.sleep(0)
+            try:
+                await asyncio.wait_for(self._events.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%s handlers still busy after %.1fs", type(self).__name__, timeout)
+
+        await self._close_consumer()
+        return ok
+
+    async def _close_consumer(self) -> None:
+        consumer = self._consumer
+        self.close_callbacks()
+        if consumer is not None and consumer is not asyncio.current_task():
+            # Wait for a cancelled handler to unwind before returning
+            await asyncio.gather(consumer, return_exceptions=True)
+
+    def emit_partial(self, text: str) -> None:
+        """Thread-safe: report a (cumulative) hypothesis of the open phrase."""
+        if self._on_partial and text:
+            self.loop.call_soon_threadsafe(self._enqueue, _PARTIAL, text)
+
+    def emit_final(self, text: str) -> None:
+        """Thread-safe: report the final result of a phrase."""
+        if self._on_final and text:
+            self.loop.call_soon_threadsafe(self._enqueue, _FINAL, text)
+
+    def close_callbacks(self) -> None:
+        """Stop delivering events (call on the loop)."""
+        self._closed = True
+        self._on_partial = None
+        self._on_final = None
+        if self._consumer is not None:
+            self._consumer.cancel()
+        if self.dropped_partials or self.dropped_finals:
+            logger.info(
+                "%s dropped %d stale partials, %d finals",
+                type(self).__name__, self.dropped_partials, self.dropped_finals,
+            )
+
+    def _enqueue(self, kind: str, text: str) -> None:
+        """Runs on the event loop; queue an event, superseding stale partials."""
+        if self._closed:
+            # Scheduled by a backend thread before the handlers were detached
+            return
+        if kind == _PARTIAL:
+            if self._partial_slot is not None:
+                # A newer hypothesis of the same phrase replaces the queued one
+                self._partial_slot[0] = text
+                self.dropped_partials += 1
+                return
+            self._partial_slot = [text]
+            item = (kind, self._partial_slot)
+        else:
+            if self._partial_slot is not None:
+                # The final result covers the whole phrase
+                self._partial_slot[0] = None
+                self._partial_slot = None
+                self.dropped_partials += 1
+            item = (kind, text)
+
+        try:
+            self._events.put_nowait(item)
+        except asyncio.QueueFull:
+            if kind == _PARTIAL:
+                self._partial_slot = None
+            else:
+                self.dropped_finals += 1
+            logger.warning("Recognition event queue full, dropping %s result", kind)
+
+    async def _consume(self) -> None:
+        while True:
+            kind, payload = await self._events.get()
+            try:
+                if kind == _PARTIAL:
+                    if payload is self._partial_slot:
+                        self._partial_slot = None
+                    text = payload[0]
+                    if text is not None and self._on_partial:
+                        await self._on_partial(text)
+                elif self._on_final:
+                    await self._on_final(payload)
+            except Exception:
+                logger.exception("Recognition %s handler failed", kind)
+            finally:
+                self._events.task_done()
@@ -0,0 +1,206 @@
+"""
+Pool of pre-warmed streaming recognizers.
+Creating an Azure recognizer (config, push stream, connection handshake) is
+slow and blocking, so sessions are built and torn down on a thread pool and
+a few connected ones are kept ready for the next "start" message.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from services.recognizer import FinalCb, PartialCb, StreamingRecognizer
+
+logger = logging.getLogger(__name__)
+
+# Builds an unstarted recognizer bound to the given loop (runs off the loop)
+RecognizerFactory = Callable[[asyncio.AbstractEventLoop], StreamingRecognizer]
+
+
+class SessionPool:
+    """Hands out pre-connected recognizers and replaces them after use."""
+
+    def __init__(
+        self,
+        factory: RecognizerFactory,
+        *,
+        size: int = 2,
+        max_workers: int = 8,
+        max_idle_s: float = 120.0,
+        stop_timeout_s: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            factory: Blocking constructor of an unstarted, preconnected
+                     recognizer; called on the pool's worker threads
+            size: Number of idle sessions to keep ready (0 = create on demand)
+            max_workers: Threads used for creation, start and teardown
+            max_idle_s: Idle sessions older than this are recycled, since the
+                        service closes connections that sit unused
+            stop_timeout_s: How long release() waits for a session to stop
+                            before abandoning it to its worker thread
+        """
+        self._factory = factory
+        self.size = max(0, size)
+        self.max_idle_s = max_idle_s
+        self.stop_timeout_s = stop_timeout_s
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speech-session")
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # (session, created_at monotonic)
+        self._idle: Deque[Tuple[StreamingRecognizer, float]] = deque()
+        self._warming = 0
+        self._closed = False
+        self._failures = 0
+
+        self.in_use = 0
+        self.created = 0
+        self.acquired = 0
+        self.pool_hits = 0
+        self.recycled = 0
+        self.expired = 0
+        self.create_errors = 0
+        self.stop_timeouts = 0
+        self._wait_ms: Deque[float] = deque(maxlen=500)
+
+    async def start(self) -> None:
+        """Bind to the running loop and begin warming sessions."""
+        self.loop = asyncio.get_running_loop()
+        self._refill()
+
+    async def acquire(self, on_partial: PartialCb, on_final: FinalCb) -> StreamingRecognizer:
+        """
+        Get a started recognizer with the given callbacks attached.
+
+        Uses an idle pre-warmed session when one is available, otherwise
+        builds one on the thread pool; the event loop never blocks.
+        """
+        if self.loop is None:
+            await self.start()
+
+        began = time.perf_counter()
+        session = self._take_idle()
+        if session is not None:
+            self.pool_hits += 1
+        else:
+            session = await self.loop.run_in_executor(self.executor, self._create)
+
+        session.bind_callbacks(on_partial, on_final)
+        try:
+            await self.loop.run_in_executor(self.executor, session.start)
+        except Exception:
+            session.close_callbacks()
+            self._discard(session)
+            raise
+
+        self.in_use += 1
+        self.acquired += 1
+        self._wait_ms.append((time.perf_counter() - began) * 1000.0)
+        self._refill()
+        return session
+
+    async def release(self, session: StreamingRecognizer, *, flush: bool = False) -> None:
+        """
+        Stop a session off the loop and detach it from its connection.
+        A fresh pre-warmed session takes its place.
+
+        Args:
+            flush: Deliver the results of audio already sent before detaching
+                   (the connection is still open); False drops them
+        """
+        self.in_use = max(0, self.in_use - 1)
+        self.recycled += 1
+        self._refill()
+        if not await session.aclose(executor=self.executor, timeout=self.stop_timeout_s, flush=flush):
+            self.stop_timeouts += 1
+
+    async def close(self) -> None:
+        """Tear down idle sessions and stop the worker threads."""
+        self._closed = True
+        idle = [s for s, _ in self._idle]
+        self._idle.clear()
+        for session in idle:
+            session.close_callbacks()
+        if self.loop is not None:
+            await asyncio.gather(
+                *(self.loop.run_in_executor(self.executor, self._teardown, s) for s in idle),
+                return_exceptions=True,
+            )
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_ms)
+        return {
+            "target_size": self.size,
+            "idle": len(self._idle),
+            "warming": self._warming,
+            "in_use": self.in_use,
+            "created": self.created,
+            "acquired": self.acquired,
+            "pool_hits": self.pool_hits,
+            "recycled": self.recycled,
+            "expired": self.expired,
+            "create_errors": self.create_errors,
+            "stop_timeouts": self.stop_timeouts,
+            "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+        }
+
+    def _take_idle(self) -> Optional[StreamingRecognizer]:
+        now = time.monotonic()
+        while self._idle:
+            session, created_at = self._idle.popleft()
+            if now - created_at <= self.max_idle_s:
+                return session
+            # Connection likely dropped by the service; replace it
+            self.expired += 1
+            self._discard(session)
+        return None
+
+    def _create(self) -> StreamingRecognizer:
+        session = self._factory(self.loop)
+        self.created += 1
+        return session
+
+    def _teardown(self, session: StreamingRecognizer) -> None:
+        try:
+            session.teardown()
+        except Exception:
+            logger.exception("Session teardown failed")
+
+    def _discard(self, session: StreamingRecognizer) -> None:
+        self.loop.run_in_executor(self.executor, self._teardown, session)
+
+    def _refill(self) -> None:
+        if self._closed or self.loop is None:
+            return
+        missing = self.size - len(self._idle) - self._warming
+        for _ in range(max(0, missing)):
+            self._warming += 1
+            self.loop.create_task(self._warm_one())
+
+    async def _warm_one(self) -> None:
+        try:
+            if self._failures:
+                # Back off while the service (or credentials) keep failing
+                await asyncio.sleep(min(60.0, 2.0 ** self._failures))
+            session = await self.loop.run_in_executor(self.executor, self._create)
+        except Exception as e:
+            self.create_errors += 1
+            self._failures += 1
+            logger.warning("Could not pre-warm speech session: %s", e)
+            self._warming -= 1
+            self._refill()
+            return
+
+        self._failures = 0
+        self._warming -= 1
+        if self._closed:
+            self._discard(session)
+            return
+        self._idle.append((session, time.monotonic()))
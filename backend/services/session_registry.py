@@ -0,0 +1,243 @@
+"""
+Shared registry of reading-session state and worker load.
+Keeps each session's passage, cursor position and word results outside the
+websocket handler, so when several worker processes (or hosts) serve
+/ws/recognize, a reconnecting client can continue on whichever one the load
+balancer picks. Workers also publish their connection counts here.
+
+Backends (selected by URL in `create_registry`):
+    memory://               single process only (development)
+    sqlite:///path/to.db    worker processes on one host
+    redis://host:6379/0     several hosts (needs the `redis` package)
+"""
+
+from __future__ import annotations
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Protocol, runtime_checkable
+
+# {"expected_words": [...], "current_index": int,
+#  "results": [[index, "recognized" | "skipped", confidence], ...],
+#  "resume_token": str, "worker": str, "updated_at": float}
+SessionState = Dict[str, Any]
+
+
+@runtime_checkable
+class SessionRegistry(Protocol):
+    """Key/value store of session state plus per-worker load reports.
+
+    Calls may block (disk or network); the websocket handler runs them in
+    an executor.
+    """
+
+    def save(self, session_id: str, state: SessionState, ttl_s: float) -> None:
+        ...
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        ...
+
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def report_worker(self, worker_id: str, connections: int, ttl_s: float) -> None:
+        ...
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        ...
+
+
+def tokens_match(expected: Optional[str], given: Optional[str]) -> bool:
+    """Constant-time resume token check."""
+    if not expected or not isinstance(given, str) or not given:
+        return False
+    return hmac.compare_digest(expected.encode(), given.encode())
+
+
+def load_resumable(registry: SessionRegistry, session_id: str, token: Optional[str]) -> Optional[SessionState]:
+    """
+    Load a session's state only for the client that owns it.
+
+    A session id alone is not proof of ownership (it travels in logs and
+    URLs); the resume token handed out with it is.
+
+    Args:
+        registry: Registry to read from
+        session_id: Session the client asks to continue
+        token: Resume token the client presented
+
+    Returns:
+        The stored state, or None if unknown, expired or the token is wrong
+    """
+    state = registry.load(session_id)
+    if state is None or not tokens_match(state.get("resume_token"), token):
+        return None
+    return state
+
+
+class InMemorySessionRegistry:
+    """Process-local registry; only correct with a single worker."""
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, tuple] = {}
+        self._workers: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def save(self, session_id: str, state: SessionState, ttl_s: float) -> None:
+        with self._lock:
+            self._sessions[session_id] = (state, time.time() + ttl_s)
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            state, expires_at = entry
+            if expires_at < time.time():
+                del self._sessions[session_id]
+                return None
+            return state
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def report_worker(self, worker_id: str, connections: int, ttl_s: float) -> None:
+        with self._lock:
+            self._workers[worker_id] = (connections, time.time(), time.time() + ttl_s)
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return {
+                wid: {"connections": n, "updated_at": ts}
+                for wid, (n, ts, expires_at) in self._workers.items()
+                if expires_at >= now
+            }
+
+
+class SQLiteSessionRegistry:
+    """Registry in a SQLite file shared by the worker processes of one host.
+
+    Also a local stand-in for the Redis backend in development and tests.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            "id TEXT PRIMARY KEY, connections INTEGER NOT NULL, "
+            "updated_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def save(self, session_id: str, state: SessionState, ttl_s: float) -> None:
+        payload = json.dumps(state, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, payload, time.time() + ttl_s),
+            )
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM sessions WHERE id = ? AND expires_at >= ?",
+                (session_id, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def report_worker(self, worker_id: str, connections: int, ttl_s: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO workers (id, connections, updated_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (worker_id, connections, now, now + ttl_s),
+            )
+            # Piggyback expiry of abandoned sessions on the heartbeat
+            self._db.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, connections, updated_at FROM workers WHERE expires_at >= ?",
+                (time.time(),),
+            ).fetchall()
+        return {wid: {"connections": n, "updated_at": ts} for wid, n, ts in rows}
+
+
+class RedisSessionRegistry:
+    """Registry in Redis, shared by workers on any number of hosts."""
+
+    def __init__(self, url: str, prefix: str = "reading:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("redis:// session registry requires the 'redis' package") from e
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def save(self, session_id: str, state: SessionState, ttl_s: float) -> None:
+        self._redis.set(
+            f"{self.prefix}session:{session_id}",
+            json.dumps(state, separators=(",", ":")),
+            px=int(ttl_s * 1000),
+        )
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        raw = self._redis.get(f"{self.prefix}session:{session_id}")
+        return json.loads(raw) if raw else None
+
+    def delete(self, session_id: str) -> None:
+        self._redis.delete(f"{self.prefix}session:{session_id}")
+
+    def report_worker(self, worker_id: str, connections: int, ttl_s: float) -> None:
+        self._redis.set(
+            f"{self.prefix}worker:{worker_id}",
+            json.dumps({"connections": connections, "updated_at": time.time()}),
+            px=int(ttl_s * 1000),
+        )
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        keys = list(self._redis.scan_iter(match=f"{self.prefix}worker:*"))
+        if not keys:
+            return {}
+        offset = len(f"{self.prefix}worker:")
+        return {
+            key.decode()[offset:]: json.loads(raw)
+            for key, raw in zip(keys, self._redis.mget(keys))
+            if raw
+        }
+
+
+def create_registry(url: str) -> SessionRegistry:
+    """
+    Build a registry from a URL (see module docstring).
+
+    Args:
+        url: memory://, sqlite:///<path> or redis://...
+
+    Returns:
+        The registry backend
+    """
+    if not url or url.startswith("memory:"):
+        return InMemorySessionRegistry()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionRegistry(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionRegistry(url)
+    raise ValueError(f"Unsupported session registry URL: {url}")
@@ -4,22 +4,65 @@ Configured for children's voices with lenient recognition.
 """
 
 import azure.cognitiveservices.speech as speechsdk
-from typing import Optional
-import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 import asyncio
+import mmap
+import os
+import struct
+import threading
+
+# (samples_per_second, bits_per_sample, channels)
+WavFormat = Tuple[int, int, int]
+DEFAULT_FORMAT: WavFormat = (16000, 16, 1)
+
+
+class _BufferReader(speechsdk.audio.PullAudioInputStreamCallback):
+    """
+    Feeds PCM from a memoryview (of bytes or an mmap'd file) to a pull
+    stream. The SDK asks for one buffer-sized chunk at a time and the data
+    is copied straight into its buffer, so large files are paged in from
+    disk as recognition proceeds instead of being loaded up front.
+    """
+
+    def __init__(self, pcm: memoryview):
+        super().__init__()
+        self._pcm = pcm
+        self._pos = 0
+
+    def read(self, buffer: memoryview) -> int:
+        size = min(len(buffer), len(self._pcm) - self._pos)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._pcm[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def close(self) -> None:
+        pass
 
 
 class SpeechRecognizer:
-    def __init__(self, subscription_key: str, region: str):
+    def __init__(
+        self,
+        subscription_key: str,
+        region: str,
+        max_workers: int = 4,
+        file_timeout_s: float = 600.0
+    ):
         """
         Initialize Azure Speech Recognizer.
 
         Args:
             subscription_key: Azure Speech Services API key
             region: Azure region (e.g., 'eastus', 'westus')
+            max_workers: Recognitions running at once; the SDK calls block,
+                         so they run on this many threads off the event loop
+            file_timeout_s: Give up on transcribing a single file after this
         """
         self.subscription_key = subscription_key
         self.region = region
+        self.file_timeout_s = file_timeout_s
 
         if not subscription_key or not region:
             raise ValueError("Azure Speech Services credentials are required")
@@ -45,42 +88,92 @@ class SpeechRecognizer:
             "2000"
         )
 
-    def _strip_wav_header(self, audio_data: bytes) -> bytes:
+        # Config objects are built once and shared; only the recognizer
+        # itself is per recognition, since it is bound to its audio stream
+        self._formats: Dict[WavFormat, speechsdk.audio.AudioStreamFormat] = {}
+        self._formats_lock = threading.Lock()
+        self._audio_format(DEFAULT_FORMAT)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="azure-recognize"
+        )
+
+    def close(self) -> None:
+        """
+        Stop the recognition threads (waits for running recognitions).
         """
-        Return PCM payload by removing the WAV container header if present.
+        self._executor.shutdown(wait=True, cancel_futures=True)
 
-        Azure PushAudioInputStream expects headerless audio buffers.
-        If the buffer does not look like a WAV file, return it unchanged.
+    def _audio_format(self, fmt: WavFormat) -> speechsdk.audio.AudioStreamFormat:
+        with self._formats_lock:
+            audio_format = self._formats.get(fmt)
+            if audio_format is None:
+                samples_per_second, bits_per_sample, channels = fmt
+                audio_format = speechsdk.audio.AudioStreamFormat(
+                    samples_per_second=samples_per_second,
+                    bits_per_sample=bits_per_sample,
+                    channels=channels
+                )
+                self._formats[fmt] = audio_format
+            return audio_format
+
+    def _parse_wav(self, audio: memoryview) -> Tuple[memoryview, WavFormat]:
         """
+        Locate the PCM payload and format of a WAV buffer without copying.
+
+        Azure audio streams expect headerless audio buffers. If the buffer
+        does not look like a WAV file, it is returned unchanged and assumed
+        to be 16 kHz 16-bit mono.
+
+        Returns:
+            (payload view into `audio`, (sample rate, bits, channels))
+        """
+        fmt = DEFAULT_FORMAT
         try:
-            if len(audio_data) < 12:
-                return audio_data
+            if len(audio) < 12:
+                return audio, fmt
             # RIFF .... WAVE
-            if audio_data[0:4] != b"RIFF" or audio_data[8:12] != b"WAVE":
-                return audio_data
+            riff, _, wave = struct.unpack_from('<4sI4s', audio, 0)
+            if riff != b"RIFF" or wave != b"WAVE":
+                return audio, fmt
 
-            # Iterate chunks to find 'data'
+            # Iterate chunks to find 'fmt ' and 'data'
             offset = 12
-            while offset + 8 <= len(audio_data):
-                chunk_id = audio_data[offset:offset+4]
-                chunk_size = struct.unpack('<I', audio_data[offset+4:offset+8])[0]
+            while offset + 8 <= len(audio):
+                chunk_id, chunk_size = struct.unpack_from('<4sI', audio, offset)
                 offset += 8
-                if chunk_id == b"data":
+                if chunk_id == b"fmt " and chunk_size >= 16:
+                    _, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', audio, offset)
+                    fmt = (sample_rate, bits, channels)
+                elif chunk_id == b"data":
                     # Return data payload from here
-                    end = min(offset + chunk_size, len(audio_data))
-                    return audio_data[offset:end]
+                    end = min(offset + chunk_size, len(audio))
+                    return audio[offset:end], fmt
                 # Chunks are word aligned
                 offset += chunk_size + (chunk_size % 2)
             # Fallback: typical PCM WAV header is 44 bytes
-            return audio_data[44:] if len(audio_data) > 44 else b""
-        except Exception:
+            return audio[44:], fmt
+        except struct.error:
             # On any parsing issue, fall back to raw buffer
-            return audio_data
+            return audio, DEFAULT_FORMAT
+
+    def _recognizer(self, pcm: memoryview, fmt: WavFormat) -> speechsdk.SpeechRecognizer:
+        stream = speechsdk.audio.PullAudioInputStream(
+            pull_stream_callback=_BufferReader(pcm),
+            stream_format=self._audio_format(fmt)
+        )
+        audio_config = speechsdk.audio.AudioConfig(stream=stream)
+        return speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_config
+        )
 
     async def recognize_from_buffer(self, audio_data: bytes) -> Optional[str]:
         """
         Recognize speech from audio buffer (WAV format from RecordRTC).
 
+        The blocking SDK call runs on the recognizer's thread pool.
+
         Args:
             audio_data: Complete WAV audio chunk from RecordRTC
 
@@ -88,34 +181,18 @@ class SpeechRecognizer:
             Recognized text or None
         """
         print(f"🎙️ [Azure] Processing WAV audio of {len(audio_data)} bytes")
-        try:
-            # Create audio format for raw PCM (16kHz, 16-bit, mono)
-            audio_format = speechsdk.audio.AudioStreamFormat(
-                samples_per_second=16000,
-                bits_per_sample=16,
-                channels=1
-            )
-
-            # Remove WAV header; Azure push streams must be headerless
-            pcm_payload = self._strip_wav_header(audio_data)
-
-            # Create push stream and write PCM frames only
-            push_stream = speechsdk.audio.PushAudioInputStream(audio_format)
-            if pcm_payload:
-                push_stream.write(pcm_payload)
-            push_stream.close()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._recognize_once, audio_data)
 
-            # Create audio config from stream
-            audio_config = speechsdk.audio.AudioConfig(stream=push_stream)
-
-            # Create speech recognizer
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
+    def _recognize_once(self, audio_data: bytes) -> Optional[str]:
+        try:
+            # Remove WAV header; Azure streams must be headerless
+            with memoryview(audio_data) as audio:
+                pcm_payload, fmt = self._parse_wav(audio)
+                recognizer = self._recognizer(pcm_payload, fmt)
 
-            # Perform one-shot recognition
-            result = recognizer.recognize_once()
+                # Perform one-shot recognition
+                result = recognizer.recognize_once()
 
             if result.reason == speechsdk.ResultReason.RecognizedSpeech:
                 recognized_text = result.text.strip()
@@ -140,6 +217,91 @@ class SpeechRecognizer:
             print(f"❌ [Azure] Error in speech recognition: {e}")
             return None
 
+    async def transcribe_file(self, path: str) -> Optional[str]:
+        """
+        Transcribe a whole WAV file (any length).
+
+        Args:
+            path: WAV file, or raw 16 kHz 16-bit mono PCM
+
+        Returns:
+            Recognized text of all utterances, or None
+        """
+        loop = asyncio.get_running_loop()
+        _, text = await loop.run_in_executor(self._executor, self._transcribe_path, path)
+        return text
+
+    async def transcribe_files(self, paths: Iterable[str]) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """
+        Transcribe many WAV files, at most max_workers at a time.
+
+        Yields:
+            (path, text or None) tuples in completion order, not input order
+        """
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self._executor, self._transcribe_path, path)
+            for path in paths
+        ]
+        try:
+            for next_done in asyncio.as_completed(futures):
+                yield await next_done
+        finally:
+            # Consumer stopped early: drop files that haven't started
+            for future in futures:
+                future.cancel()
+
+    def _transcribe_path(self, path: str) -> Tuple[str, Optional[str]]:
+        try:
+            if os.path.getsize(path) == 0:
+                return path, None
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as audio:
+                    pcm_payload, fmt = self._parse_wav(audio)
+                    try:
+                        text = self._recognize_continuous(pcm_payload, fmt)
+                    finally:
+                        # Views must be gone before the mmap closes
+                        pcm_payload.release()
+            print(f"✅ [Azure] Transcribed {path}")
+            return path, text
+        except Exception as e:
+            print(f"❌ [Azure] Error transcribing {path}: {e}")
+            return path, None
+
+    def _recognize_continuous(self, pcm: memoryview, fmt: WavFormat) -> Optional[str]:
+        """
+        Run continuous recognition over the whole payload (blocking).
+        """
+        recognizer = self._recognizer(pcm, fmt)
+        texts: List[str] = []
+        done = threading.Event()
+
+        def recognized_cb(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+                texts.append(evt.result.text.strip())
+
+        def canceled_cb(evt):
+            # End of stream also arrives as a cancellation
+            if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+                print(f"❌ [Azure] Recognition canceled: {evt.cancellation_details.error_details}")
+            done.set()
+
+        recognizer.recognized.connect(recognized_cb)
+        recognizer.canceled.connect(canceled_cb)
+        recognizer.session_stopped.connect(lambda evt: done.set())
+
+        recognizer.start_continuous_recognition()
+        try:
+            if not done.wait(self.file_timeout_s):
+                print(f"❌ [Azure] Transcription timed out after {self.file_timeout_s}s")
+        finally:
+            recognizer.stop_continuous_recognition()
+
+        return " ".join(texts) if texts else None
+
     async def recognize_continuous(self, audio_stream, callback):
         """
         Recognize speech continuously from an audio stream.
@@ -1,16 +1,18 @@
 from __future__ import annotations
 import asyncio
 import logging
-from typing import Awaitable, Callable, Optional
+from typing import Optional
 import azure.cognitiveservices.speech as speechsdk
 
+from services.recognizer import FinalCb, PartialCb, QueuedCallbacks
+
 logger = logging.getLogger(__name__)
 
-PartialCb = Callable[[str], Awaitable[None]]
-FinalCb = Callable[[str], Awaitable[None]]
+class AzureStreamingSession(QueuedCallbacks):
+    """Continuous Azure STT on a PushAudioInputStream (expects raw PCM16 mono 16k).
 
-class AzureStreamingSession:
-    """Continuous Azure STT on a PushAudioInputStream (expects raw PCM16 mono 16k)."""
+    Implements the StreamingRecognizer protocol.
+    """
 
     def __init__(
         self,
@@ -21,13 +23,26 @@ class AzureStreamingSession:
         loop: Optional[asyncio.AbstractEventLoop] = None,
         on_partial: Optional[PartialCb] = None,
         on_final: Optional[FinalCb] = None,
+        max_queued_events: int = 64,
+        start: bool = True,
     ) -> None:
+        """
+        Args:
+            start: Start continuous recognition right away. A session pool
+                   passes False, pre-opens the connection with `preconnect()`
+                   and calls `start()` when the session is handed out.
+        """
         if not speech_key or not region:
             raise ValueError("Azure Speech credentials required")
 
-        self.loop = loop or asyncio.get_event_loop()
-        self._on_partial = on_partial
-        self._on_final = on_final
+        # SDK callbacks run on Azure threads; they only hand events to the
+        # loop, and one consumer task runs the handlers strictly in order.
+        super().__init__(
+            loop=loop,
+            on_partial=on_partial,
+            on_final=on_final,
+            max_queued_events=max_queued_events,
+        )
 
         cfg = speechsdk.SpeechConfig(subscription=speech_key, region=region)
         cfg.speech_recognition_language = language
@@ -41,19 +56,24 @@ class AzureStreamingSession:
         self.recognizer = speechsdk.SpeechRecognizer(speech_config=cfg, audio_config=audio)
 
         def recognizing_cb(evt):
-            if self._on_partial and evt.result:
-                text = (evt.result.text or "").strip()
-                if text:
-                    asyncio.run_coroutine_threadsafe(self._on_partial(text), self.loop)
+            if evt.result:
+                self.emit_partial((evt.result.text or "").strip())
 
         def recognized_cb(evt):
-            if self._on_final and evt.result and evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                text = (evt.result.text or "").strip()
-                if text:
-                    asyncio.run_coroutine_threadsafe(self._on_final(text), self.loop)
+            if evt.result and evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                self.emit_final((evt.result.text or "").strip())
 
         self.recognizer.recognizing.connect(recognizing_cb)
         self.recognizer.recognized.connect(recognized_cb)
+        if start:
+            self.start()
+
+    def preconnect(self) -> None:
+        """Open the service connection ahead of recognition (blocking)."""
+        self._connection = speechsdk.Connection.from_recognizer(self.recognizer)
+        self._connection.open(True)
+
+    def start(self) -> None:
         self.recognizer.start_continuous_recognition()
         logger.info("AzureStreamingSession started")
 
@@ -61,11 +81,8 @@ class AzureStreamingSession:
         if pcm_bytes:
             self.push_stream.write(pcm_bytes)
 
-    def stop(self) -> None:
+    def teardown(self) -> None:
         try:
             self.push_stream.close()
         finally:
-            try:
-                self.recognizer.stop_continuous_recognition()
-            finally:
-                pass
+            self.recognizer.stop_continuous_recognition()
@@ -0,0 +1,143 @@
+"""
+Server-side voice-activity gate in front of the recognizer.
+Classifies 20 ms PCM16 frames by energy and zero-crossing rate, passes
+speech with pre-roll and hangover padding, and replaces long silences with
+a short stretch of digital silence so Azure still closes the phrase.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Callable, Deque, Dict
+import threading
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class VoiceActivityGate:
+    """Energy / zero-crossing VAD that drops silent audio before the sink."""
+
+    def __init__(
+        self,
+        sink: Callable[[bytes], None],
+        *,
+        energy_threshold_db: float = -45.0,
+        zcr_max: float = 0.35,
+        frame_ms: int = 20,
+        preroll_ms: int = 200,
+        hangover_ms: int = 300,
+        keepalive_ms: int = 800,
+    ) -> None:
+        """
+        Args:
+            sink: Receives the gated PCM16 audio (e.g. push_pcm16)
+            energy_threshold_db: Frames quieter than this (dBFS) are silence
+            zcr_max: Zero-crossing rate above which a frame that is only
+                     slightly above the threshold counts as noise (hiss, fans)
+            frame_ms: Analysis frame length
+            preroll_ms: Silence kept before speech so word onsets survive
+            hangover_ms: Audio kept after speech so word endings survive
+            keepalive_ms: Digital silence sent after the hangover before
+                          dropping; keep it above Azure's segmentation
+                          silence timeout (650 ms) so phrases still finalize
+        """
+        self._sink = sink
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_max = zcr_max
+        self.frame_bytes = SAMPLE_RATE * 2 * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self._preroll_frames = preroll_ms // frame_ms
+        self._hangover_frames = hangover_ms // frame_ms
+        self._keepalive_frames = keepalive_ms // frame_ms
+
+        self._preroll: Deque[bytes] = deque(maxlen=max(1, self._preroll_frames))
+        self._hangover_left = 0
+        self._keepalive_left = self._keepalive_frames
+        self._in_speech = False
+        # Odd trailing byte of the last chunk: half a sample, completed by
+        # the next one (forwarding it alone would shift every later sample)
+        self._carry = b""
+        self._lock = threading.Lock()
+
+        self.frames_in = 0
+        self.frames_passed = 0
+        self.frames_dropped = 0
+        # Frames at the end of a chunk can be partial, so time saved is
+        # counted in bytes rather than frames
+        self._bytes_dropped = 0
+
+    @property
+    def seconds_saved(self) -> float:
+        return self._bytes_dropped / (SAMPLE_RATE * 2)
+
+    def process(self, pcm: bytes) -> None:
+        """
+        Gate one chunk of PCM16 audio and forward what should be kept.
+        """
+        with self._lock:
+            if self._carry:
+                pcm = self._carry + pcm
+            usable = len(pcm) - (len(pcm) % 2)
+            self._carry = pcm[usable:]
+        if not usable:
+            return
+
+        samples = np.frombuffer(pcm, dtype="<i2", count=usable // 2).astype(np.float32)
+        frame_len = self.frame_bytes // 2
+        n_frames = -(-len(samples) // frame_len)
+        padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+        padded[:len(samples)] = samples
+        frames = padded.reshape(n_frames, frame_len)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(rms / 32768.0 + 1e-10)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+        speech = (energy_db > self.energy_threshold_db) & (
+            (zcr <= self.zcr_max) | (energy_db > self.energy_threshold_db + 10.0)
+        )
+
+        out = []
+        with self._lock:
+            for i in range(n_frames):
+                frame = pcm[i * self.frame_bytes:min((i + 1) * self.frame_bytes, usable)]
+                self.frames_in += 1
+                if speech[i]:
+                    if not self._in_speech:
+                        # Word onset: release the buffered pre-roll first
+                        out.extend(self._preroll)
+                        self.frames_passed += len(self._preroll)
+                        self.frames_dropped -= len(self._preroll)
+                        self._bytes_dropped -= sum(len(f) for f in self._preroll)
+                        self._preroll.clear()
+                        self._in_speech = True
+                    self._hangover_left = self._hangover_frames
+                    self._keepalive_left = self._keepalive_frames
+                    out.append(frame)
+                    self.frames_passed += 1
+                elif self._hangover_left > 0:
+                    self._hangover_left -= 1
+                    out.append(frame)
+                    self.frames_passed += 1
+                elif self._keepalive_left > 0:
+                    # Short digital silence so the recognizer ends the phrase
+                    self._in_speech = False
+                    self._keepalive_left -= 1
+                    out.append(bytes(len(frame)))
+                    self.frames_passed += 1
+                else:
+                    self._in_speech = False
+                    if self._preroll_frames:
+                        self._preroll.append(frame)
+                    self.frames_dropped += 1
+                    self._bytes_dropped += len(frame)
+
+        if out:
+            self._sink(b"".join(out))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames_in": self.frames_in,
+            "frames_passed": self.frames_passed,
+            "frames_dropped": self.frames_dropped,
+            "seconds_saved": round(self.seconds_saved, 2),
+        }
@@ -3,23 +3,73 @@ Word Matching Service with lenient fuzzy matching for kids.
 Prioritizes recognition over pronunciation accuracy.
 """
 
-from typing import Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from collections import Counter
+from itertools import zip_longest
 import jellyfish
 from fuzzywuzzy import fuzz
 import Levenshtein
+import numpy as np
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
 import re
+import threading
+
+from services.match_cache import MatchCache
+from services.aligner import PassageAligner
+
+# (soundex, metaphone, match rating codex); None where encoding failed
+PhoneticCodes = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class CompiledPassage:
+    """
+    Expected words of one reading passage with everything the matcher needs
+    precomputed once, so only the spoken token is encoded at match time.
+    """
+
+    __slots__ = ('words', 'normalized', 'soundex', 'metaphone', 'mra_codex')
+
+    def __init__(
+        self,
+        words: Tuple[str, ...],
+        normalized: Tuple[str, ...],
+        soundex: Tuple[Optional[str], ...],
+        metaphone: Tuple[Optional[str], ...],
+        mra_codex: Tuple[Optional[str], ...],
+    ):
+        self.words = words
+        self.normalized = normalized
+        self.soundex = soundex
+        self.metaphone = metaphone
+        self.mra_codex = mra_codex
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def codes(self, index: int) -> PhoneticCodes:
+        """
+        Phonetic codes of the expected word at `index`.
+        """
+        return (self.soundex[index], self.metaphone[index], self.mra_codex[index])
 
 
 class WordMatcher:
-    def __init__(self, threshold: float = 0.70):
+    def __init__(self, threshold: float = 0.70, cache: Optional[MatchCache] = None):
         """
         Initialize Word Matcher with lenient threshold.
 
         Args:
             threshold: Minimum similarity score (0.0 to 1.0) for a match.
                       Default 0.70 means 70% similarity = pass
+            cache: Optional shared memo cache for token encodings and
+                   match results (no caching when omitted)
         """
         self.threshold = threshold
+        self.cache = cache
+
+        # How often each cascade stage decided a result (see stage_stats)
+        self._stage_counts: Counter = Counter()
+        self._stage_lock = threading.Lock()
 
         # Common children mispronunciations and variations
         self.common_variants = {
@@ -48,33 +98,293 @@ class WordMatcher:
         expected_clean = self._normalize(expected)
         spoken_clean = self._normalize(spoken)
 
+        return self._match_normalized(expected_clean, None, spoken_clean)
+
+    def compile_passage(self, words: Sequence[str]) -> CompiledPassage:
+        """
+        Normalize and phonetically encode every expected word of a passage once.
+
+        Args:
+            words: Expected words in reading order
+
+        Returns:
+            CompiledPassage to pass to `match_compiled`
+        """
+        normalized = tuple(self._normalize(w) for w in words)
+
+        # Encode each distinct word once
+        distinct = {w: self._cached_codes(w) for w in set(normalized)}
+        codes = [distinct[w] for w in normalized]
+
+        return CompiledPassage(
+            words=tuple(words),
+            normalized=normalized,
+            soundex=tuple(c[0] for c in codes),
+            metaphone=tuple(c[1] for c in codes),
+            mra_codex=tuple(c[2] for c in codes),
+        )
+
+    def match_compiled(self, passage: CompiledPassage, index: int, spoken: str) -> Tuple[bool, float]:
+        """
+        Same as `match`, against the precompiled expected word at `index`.
+
+        Args:
+            passage: Passage built by `compile_passage`
+            index: Position of the expected word in the passage
+            spoken: The word that was actually spoken
+
+        Returns:
+            Tuple of (is_match, confidence_score)
+        """
+        return self._match_normalized(
+            passage.normalized[index],
+            passage.codes(index),
+            self._normalize(spoken),
+        )
+
+    def _match_normalized(
+        self,
+        expected_clean: str,
+        expected_codes: Optional[PhoneticCodes],
+        spoken_clean: str,
+    ) -> Tuple[bool, float]:
+        """
+        Run the matching cascade on already normalized words.
+        `expected_codes` are computed on demand when not precompiled.
+        """
         # 1. Exact match
         if expected_clean == spoken_clean:
+            self._count_stage('exact')
             return (True, 1.0)
 
         # 2. Check common variants
         if self._is_common_variant(expected_clean, spoken_clean):
+            self._count_stage('variant')
             return (True, 0.95)
 
-        # 3. Phonetic similarity (Soundex and Metaphone)
-        phonetic_score = self._phonetic_similarity(expected_clean, spoken_clean)
+        # 3. Length bound: reject without encoding anything when neither the
+        #    string scores nor the phonetic score can reach the threshold
+        len1 = len(expected_clean)
+        len2 = len(spoken_clean)
+        text_bound = max(_levenshtein_bound(len1, len2), _fuzzy_bound(len1, len2))
+        if text_bound < self.threshold:
+            phonetic_bound = 1.0
+            if _first_letters_differ(expected_clean, spoken_clean):
+                # Soundex starts with the first letter, so at most 2 of the
+                # 3 phonetic algorithms can agree
+                phonetic_bound = 2.0 / 3.0
+            if phonetic_bound < self.threshold:
+                self._count_stage('length_bound')
+                return (False, max(text_bound, phonetic_bound))
+
+        # Repeated words skip the phonetic and fuzzy algorithms entirely
+        if self.cache is not None:
+            key = (expected_clean, spoken_clean, self.threshold)
+            cached = self.cache.results.get(key)
+            if cached is not None:
+                self._count_stage('cache')
+                return cached
+            result = self._score(expected_clean, expected_codes, spoken_clean, text_bound)
+            self.cache.results.put(key, result)
+            return result
+
+        return self._score(expected_clean, expected_codes, spoken_clean, text_bound)
+
+    def _score(
+        self,
+        expected_clean: str,
+        expected_codes: Optional[PhoneticCodes],
+        spoken_clean: str,
+        text_bound: float,
+    ) -> Tuple[bool, float]:
+        """
+        Phonetic, edit distance and fuzzy scoring of two normalized words.
+
+        Each stage is skipped when its upper bound cannot change the outcome,
+        so accepted matches keep exactly the score of the full computation.
+        Early rejections report the bound that proved them instead.
+        """
+        # 4. Phonetic similarity (Soundex and Metaphone)
+        if expected_codes is None:
+            expected_codes = self._cached_codes(expected_clean)
+        phonetic_score = self._compare_codes(expected_codes, self._cached_codes(spoken_clean))
         if phonetic_score >= 0.85:
+            self._count_stage('phonetic')
             return (True, phonetic_score)
 
-        # 4. Edit distance (Levenshtein)
-        edit_distance_score = self._levenshtein_similarity(expected_clean, spoken_clean)
+        if max(phonetic_score, text_bound) < self.threshold:
+            self._count_stage('phonetic_bound')
+            return (False, max(phonetic_score, text_bound))
+
+        len1 = len(expected_clean)
+        len2 = len(spoken_clean)
+
+        # 5. Edit distance (Levenshtein)
+        if _levenshtein_bound(len1, len2) > phonetic_score:
+            edit_distance_score = self._levenshtein_similarity(expected_clean, spoken_clean)
+        else:
+            edit_distance_score = 0.0
+        best = max(phonetic_score, edit_distance_score)
+
+        # 6. Fuzzy string matching
+        fuzzy_bound = _fuzzy_bound(len1, len2)
+        if fuzzy_bound <= best:
+            self._count_stage('levenshtein')
+            return (best >= self.threshold, best)
+        if fuzzy_bound < self.threshold:
+            self._count_stage('levenshtein_bound')
+            return (False, fuzzy_bound)
 
-        # 5. Fuzzy string matching
         fuzzy_score = self._fuzzy_similarity(expected_clean, spoken_clean)
 
         # Take the maximum score from all algorithms
-        final_score = max(phonetic_score, edit_distance_score, fuzzy_score)
+        final_score = max(best, fuzzy_score)
 
         # Apply lenient threshold
         is_match = final_score >= self.threshold
 
+        self._count_stage('fuzzy')
         return (is_match, final_score)
 
+    def match_many(
+        self,
+        expected_seq: Union[Sequence[str], CompiledPassage],
+        spoken_seq: Union[Sequence[str], CompiledPassage],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many (expected, spoken) pairs in one call.
+
+        Gives the same decisions and confidences as calling `match` on each
+        pair, but encodes every distinct word once and computes the edit
+        distance and fuzzy scores for all pairs in batched native calls.
+
+        Args:
+            expected_seq: Expected words (or a CompiledPassage), pairwise
+                          aligned with spoken_seq
+            spoken_seq: Words that were actually spoken (or a CompiledPassage)
+
+        Returns:
+            Tuple of (is_match, confidence) arrays of dtype bool and float64
+        """
+        if len(expected_seq) != len(spoken_seq):
+            raise ValueError("expected_seq and spoken_seq must have the same length")
+
+        if not isinstance(expected_seq, CompiledPassage):
+            expected_seq = self.compile_passage(expected_seq)
+        if not isinstance(spoken_seq, CompiledPassage):
+            spoken_seq = self.compile_passage(spoken_seq)
+
+        index = np.arange(len(spoken_seq), dtype=np.intp)
+        return self.match_pairs(expected_seq, spoken_seq, index, index)
+
+    def match_pairs(
+        self,
+        expected: CompiledPassage,
+        spoken: CompiledPassage,
+        expected_index: np.ndarray,
+        spoken_index: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score arbitrary (expected[i], spoken[j]) pairs given as index arrays.
+
+        Every distinct pair of words is scored once, so repeated words (or
+        the overlapping cells of an alignment band) cost nothing extra.
+
+        Args:
+            expected: Compiled expected words
+            spoken: Compiled spoken words
+            expected_index: Positions into `expected`
+            spoken_index: Positions into `spoken`, same length
+
+        Returns:
+            Tuple of (is_match, confidence) arrays of dtype bool and float64
+        """
+        n = len(expected_index)
+        if n == 0:
+            return (np.zeros(0, dtype=bool), np.zeros(0, dtype=np.float64))
+
+        # Shared vocabulary of both passages, with codes per distinct word
+        vocab: List[str] = []
+        vocab_codes: List[PhoneticCodes] = []
+        position: Dict[str, int] = {}
+        for passage in (expected, spoken):
+            for i, word in enumerate(passage.normalized):
+                if word not in position:
+                    position[word] = len(vocab)
+                    vocab.append(word)
+                    vocab_codes.append(passage.codes(i))
+        v = len(vocab)
+        expected_ids = np.fromiter((position[w] for w in expected.normalized), dtype=np.intp, count=len(expected))
+        spoken_ids = np.fromiter((position[w] for w in spoken.normalized), dtype=np.intp, count=len(spoken))
+
+        # Score each distinct word pair once
+        pair_ids = expected_ids[expected_index] * v + spoken_ids[spoken_index]
+        unique_pairs, pair_inverse = np.unique(pair_ids, return_inverse=True)
+        pair_inverse = pair_inverse.reshape(-1)
+        left = unique_pairs // v
+        right = unique_pairs % v
+        words = np.array(vocab, dtype=object)
+        left_words = words[left]
+        right_words = words[right]
+        u = len(unique_pairs)
+
+        # Codes compared as small integer ids; -1 where encoding failed
+        soundex = _code_ids([c[0] for c in vocab_codes])
+        metaphone = _code_ids([c[1] for c in vocab_codes])
+        soundex_match = (soundex[left] >= 0) & (soundex[left] == soundex[right])
+        metaphone_match = (metaphone[left] >= 0) & (metaphone[left] == metaphone[right])
+        mra_match = _mra_comparison_many([c[2] for c in vocab_codes], left, right)
+
+        phonetic = (soundex_match.astype(np.float64)
+                    + metaphone_match.astype(np.float64)
+                    + mra_match.astype(np.float64)) / 3.0
+
+        # Batched Levenshtein distance and fuzz.ratio over all pairs
+        lengths = np.array([len(w) for w in vocab], dtype=np.float64)
+        len1 = lengths[left]
+        len2 = lengths[right]
+        empty = (len1 == 0) | (len2 == 0)
+
+        distance = rf_process.cpdist(left_words, right_words, scorer=Levenshtein.distance, dtype=np.int32, workers=-1)
+        max_len = np.maximum(np.maximum(len1, len2), 1.0)
+        edit_distance = np.maximum(0.0, 1.0 - distance / max_len)
+        edit_distance[empty] = 0.0
+
+        fuzzy = np.round(rf_process.cpdist(left_words, right_words, scorer=rf_fuzz.ratio, dtype=np.float64, workers=-1)) / 100.0
+        fuzzy[empty] = 0.0
+
+        confidence = np.maximum(np.maximum(phonetic, edit_distance), fuzzy)
+        is_match = confidence >= self.threshold
+
+        # Earlier cascade stages override the blended score
+        strong_phonetic = phonetic >= 0.85
+        confidence[strong_phonetic] = phonetic[strong_phonetic]
+        is_match[strong_phonetic] = True
+
+        variant = np.zeros(u, dtype=bool)
+        has_variants = np.array([w in self.common_variants for w in vocab])
+        for k in np.flatnonzero(has_variants[left]).tolist():
+            variant[k] = self._is_common_variant(left_words[k], right_words[k])
+        confidence[variant] = 0.95
+        is_match[variant] = True
+
+        exact = left == right
+        confidence[exact] = 1.0
+        is_match[exact] = True
+
+        return (is_match[pair_inverse], confidence[pair_inverse])
+
+    def stage_stats(self) -> Dict[str, int]:
+        """
+        Number of match calls decided at each cascade stage, for tuning.
+        """
+        with self._stage_lock:
+            return dict(self._stage_counts)
+
+    def _count_stage(self, stage: str) -> None:
+        with self._stage_lock:
+            self._stage_counts[stage] += 1
+
     def _normalize(self, word: str) -> str:
         """
         Normalize word by removing punctuation and converting to lowercase.
@@ -95,28 +405,55 @@ class WordMatcher:
         """
         Calculate phonetic similarity using multiple algorithms.
         """
+        return self._compare_codes(self._phonetic_codes(word1), self._phonetic_codes(word2))
+
+    def _phonetic_codes(self, word: str) -> PhoneticCodes:
+        """
+        Encode a normalized word with Soundex, Metaphone and Match Rating Codex.
+        """
         # Soundex - good for American English pronunciation
         try:
-            soundex1 = jellyfish.soundex(word1)
-            soundex2 = jellyfish.soundex(word2)
-            soundex_match = 1.0 if soundex1 == soundex2 else 0.0
+            soundex = jellyfish.soundex(word)
         except:
-            soundex_match = 0.0
+            soundex = None
 
         # Metaphone - another phonetic algorithm
         try:
-            metaphone1 = jellyfish.metaphone(word1)
-            metaphone2 = jellyfish.metaphone(word2)
-            metaphone_match = 1.0 if metaphone1 == metaphone2 else 0.0
+            metaphone = jellyfish.metaphone(word)
         except:
-            metaphone_match = 0.0
+            metaphone = None
 
         # Match Rating Codex - comprehensive phonetic matching
         try:
-            match_rating = jellyfish.match_rating_comparison(word1, word2)
-            match_rating_score = 1.0 if match_rating else 0.0
+            mra_codex = jellyfish.match_rating_codex(word)
         except:
-            match_rating_score = 0.0
+            mra_codex = None
+
+        return (soundex, metaphone, mra_codex)
+
+    def _cached_codes(self, word: str) -> PhoneticCodes:
+        """
+        Phonetic codes of a normalized word, served from the cache if possible.
+        """
+        if self.cache is None:
+            return self._phonetic_codes(word)
+
+        codes = self.cache.codes.get(word)
+        if codes is None:
+            codes = self._phonetic_codes(word)
+            self.cache.codes.put(word, codes)
+        return codes
+
+    def _compare_codes(self, codes1: PhoneticCodes, codes2: PhoneticCodes) -> float:
+        """
+        Average agreement of two words' phonetic codes (0, 1/3, 2/3 or 1).
+        """
+        soundex1, metaphone1, mra1 = codes1
+        soundex2, metaphone2, mra2 = codes2
+
+        soundex_match = 1.0 if soundex1 is not None and soundex1 == soundex2 else 0.0
+        metaphone_match = 1.0 if metaphone1 is not None and metaphone1 == metaphone2 else 0.0
+        match_rating_score = 1.0 if _mra_comparison(mra1, mra2) else 0.0
 
         # Return average of all phonetic algorithms
         return (soundex_match + metaphone_match + match_rating_score) / 3.0
@@ -153,27 +490,32 @@ class WordMatcher:
 
         return score
 
-    def calculate_passage_accuracy(self, expected_words: list, recognized_words: list) -> dict:
+    def calculate_passage_accuracy(
+        self,
+        expected_words: list,
+        recognized_words: list,
+        band: Optional[int] = 8,
+    ) -> dict:
         """
         Calculate overall accuracy for an entire passage.
 
+        Words are aligned first, so a skipped or extra word only costs
+        itself instead of misaligning the rest of the passage.
+
         Args:
             expected_words: List of words that should have been read
             recognized_words: List of words that were actually spoken
+            band: Columns the alignment searches around its guide path
+                  (None = full alignment)
 
         Returns:
-            Dictionary with accuracy metrics
+            Dictionary with accuracy metrics and per-word operations
         """
-        total_words = len(expected_words)
-        matched_words = 0
-        confidence_scores = []
+        alignment = PassageAligner(self, band=band).align(expected_words, recognized_words)
 
-        for i, expected in enumerate(expected_words):
-            if i < len(recognized_words):
-                is_match, confidence = self.match(expected, recognized_words[i])
-                if is_match:
-                    matched_words += 1
-                    confidence_scores.append(confidence)
+        total_words = len(expected_words)
+        matched_words = alignment['matches']
+        confidence_scores = [op['confidence'] for op in alignment['operations'] if op['op'] == 'match']
 
         accuracy = (matched_words / total_words * 100) if total_words > 0 else 0
         avg_confidence = (sum(confidence_scores) / len(confidence_scores)) if confidence_scores else 0
@@ -181,9 +523,13 @@ class WordMatcher:
         return {
             'total_words': total_words,
             'matched_words': matched_words,
+            'substitutions': alignment['substitutions'],
+            'omissions': alignment['omissions'],
+            'insertions': alignment['insertions'],
             'accuracy_percentage': round(accuracy, 2),
             'average_confidence': round(avg_confidence, 2),
-            'rating': self._get_rating(accuracy)
+            'rating': self._get_rating(accuracy),
+            'words': alignment['operations'],
         }
 
     def _get_rating(self, accuracy: float) -> str:
@@ -198,3 +544,169 @@ class WordMatcher:
             return "⭐ Good effort!"
         else:
             return "Keep practicing! You're improving!"
+
+
+def _levenshtein_bound(len1: int, len2: int) -> float:
+    """
+    Upper bound of `_levenshtein_similarity` from word lengths alone:
+    the edit distance is at least the length difference.
+    """
+    if not len1 or not len2:
+        return 0.0
+    return 1.0 - (abs(len1 - len2) / max(len1, len2))
+
+
+def _fuzzy_bound(len1: int, len2: int) -> float:
+    """
+    Upper bound of `_fuzzy_similarity` from word lengths alone: fuzz.ratio
+    is 2*M/(len1+len2) with M <= min(len1, len2), rounded to a percent.
+    """
+    if not len1 or not len2:
+        return 0.0
+    return min(1.0, 2.0 * min(len1, len2) / (len1 + len2) + 0.005 + 1e-9)
+
+
+def _first_letters_differ(word1: str, word2: str) -> bool:
+    """
+    True when both words start with different ASCII letters, which
+    guarantees different Soundex codes.
+    """
+    if not word1 or not word2:
+        return False
+    c1 = word1[0]
+    c2 = word2[0]
+    return c1 != c2 and c1.isascii() and c2.isascii() and c1.isalpha() and c2.isalpha()
+
+
+def _mra_comparison(codex1: Optional[str], codex2: Optional[str]) -> bool:
+    """
+    Match Rating Approach comparison on precomputed codexes; mirrors
+    `jellyfish.match_rating_comparison` without re-encoding both words.
+
+    jellyfish's native implementation measures codex lengths in UTF-8
+    bytes (while comparing characters), which only matters for non-ASCII
+    words; the lengths are taken the same way so results stay identical.
+    """
+    if codex1 is None or codex2 is None:
+        return False
+
+    len1 = len(codex1) if codex1.isascii() else len(codex1.encode('utf-8'))
+    len2 = len(codex2) if codex2.isascii() else len(codex2.encode('utf-8'))
+
+    # length differs by 3 or more, no result
+    if abs(len1 - len2) >= 3:
+        return False
+
+    # get minimum rating based on sums of codexes
+    lensum = len1 + len2
+    if lensum <= 4:
+        min_rating = 5
+    elif lensum <= 7:
+        min_rating = 4
+    elif lensum <= 11:
+        min_rating = 3
+    else:
+        min_rating = 2
+
+    # strip off characters that agree left to right
+    res1: List[str] = []
+    res2: List[str] = []
+    for c1, c2 in zip_longest(codex1, codex2):
+        if c1 != c2:
+            if c1:
+                res1.append(c1)
+            if c2:
+                res2.append(c2)
+
+    # then count what still disagrees right to left
+    unmatched1 = unmatched2 = 0
+    for c1, c2 in zip_longest(reversed(res1), reversed(res2)):
+        if c1 != c2:
+            if c1:
+                unmatched1 += 1
+            if c2:
+                unmatched2 += 1
+
+    return (6 - max(unmatched1, unmatched2)) >= min_rating
+
+
+def _mra_comparison_many(
+    codexes: Sequence[Optional[str]],
+    left: np.ndarray,
+    right: np.ndarray,
+) -> np.ndarray:
+    """
+    `_mra_comparison` of codexes[left[k]] against codexes[right[k]] for
+    every k at once. Codexes are at most six characters, so the left-to-right
+    and right-to-left stripping run column-wise over padded code points.
+    """
+    count = len(codexes)
+    width = max([len(c) for c in codexes if c is not None] + [1])
+    points = np.zeros((count, width), dtype=np.int32)
+    chars = np.zeros(count, dtype=np.intp)
+    nbytes = np.zeros(count, dtype=np.intp)
+    valid = np.zeros(count, dtype=bool)
+    for i, codex in enumerate(codexes):
+        if codex is None:
+            continue
+        valid[i] = True
+        chars[i] = len(codex)
+        # Lengths in UTF-8 bytes, as jellyfish measures them
+        nbytes[i] = len(codex) if codex.isascii() else len(codex.encode('utf-8'))
+        points[i, :len(codex)] = [ord(c) for c in codex]
+
+    result = np.zeros(len(left), dtype=bool)
+    # Length differs by 3 or more: no result
+    len1 = nbytes[left]
+    len2 = nbytes[right]
+    candidates = np.flatnonzero(valid[left] & valid[right] & (np.abs(len1 - len2) < 3))
+    if len(candidates) == 0:
+        return result
+    left = left[candidates]
+    right = right[candidates]
+
+    # Minimum rating based on sums of codexes
+    lensum = len1[candidates] + len2[candidates]
+    min_rating = np.select([lensum <= 4, lensum <= 7, lensum <= 11], [5, 4, 3], 2)
+
+    # Strip characters that agree left to right (zero padding never
+    # equals a character, so it stands in for zip_longest's None)
+    columns = np.arange(width)
+    codex1 = points[left]
+    codex2 = points[right]
+    differ = codex1 != codex2
+    keep1 = differ & (columns < chars[left][:, None])
+    keep2 = differ & (columns < chars[right][:, None])
+
+    # Then count what still disagrees right to left
+    rest1, kept1 = _from_right(codex1, keep1, -1)
+    rest2, kept2 = _from_right(codex2, keep2, -2)
+    differ = rest1 != rest2
+    unmatched1 = (differ & (columns < kept1[:, None])).sum(axis=1)
+    unmatched2 = (differ & (columns < kept2[:, None])).sum(axis=1)
+
+    result[candidates] = (6 - np.maximum(unmatched1, unmatched2)) >= min_rating
+    return result
+
+
+def _from_right(values: np.ndarray, keep: np.ndarray, fill: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per row, the kept values last to first, padded with `fill`; also
+    returns how many were kept.
+    """
+    columns = np.where(keep, np.arange(values.shape[1]), -1)
+    columns = -np.sort(-columns, axis=1)
+    out = np.take_along_axis(values, np.maximum(columns, 0), axis=1)
+    out[columns < 0] = fill
+    return out, keep.sum(axis=1)
+
+
+def _code_ids(codes: Sequence[Optional[str]]) -> np.ndarray:
+    """
+    Phonetic codes as integers (equal codes, equal ids); -1 for None.
+    """
+    ids: Dict[str, int] = {}
+    return np.array(
+        [ids.setdefault(code, len(ids)) if code is not None else -1 for code in codes],
+        dtype=np.intp,
+    )
@@ -0,0 +1,88 @@
+import random
+import time
+
+import pytest
+
+from services.aligner import PassageAligner
+from services.word_matcher import WordMatcher
+
+VOCAB = "the cat sat on mat dog ran far away into forest and river tree bird song light dark moon star".split()
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return WordMatcher()
+
+
+@pytest.fixture(scope="module")
+def passage():
+    rng = random.Random(0)
+    return [f"{rng.choice(VOCAB)}{rng.randint(0, 50)}" for _ in range(600)]
+
+
+def positional_matches(expected, spoken):
+    return sum(1 for e, s in zip(expected, spoken) if e == s)
+
+
+def test_truncated_reading_matches_every_read_word(matcher, passage):
+    spoken = passage[:300]
+    result = matcher.calculate_passage_accuracy(passage, spoken, band=10)
+    assert result['matched_words'] == 300
+    assert result['omissions'] == 300
+    assert result['matched_words'] >= positional_matches(passage, spoken)
+
+
+def test_over_long_reading_matches_whole_passage(matcher, passage):
+    spoken = passage + passage[:150]
+    result = matcher.calculate_passage_accuracy(passage, spoken, band=10)
+    assert result['matched_words'] == len(passage)
+    assert result['insertions'] == 150
+
+
+def test_repeated_opening_is_insertions(matcher, passage):
+    spoken = passage[:100] + passage
+    result = matcher.calculate_passage_accuracy(passage, spoken, band=10)
+    assert result['matched_words'] == len(passage)
+    assert result['insertions'] == 100
+
+
+def test_skipped_section_is_omissions(matcher, passage):
+    spoken = passage[:200] + passage[400:]
+    result = matcher.calculate_passage_accuracy(passage, spoken, band=10)
+    assert result['matched_words'] == 400
+    assert result['omissions'] == 200
+
+
+def test_band_agrees_with_full_alignment_on_noisy_reading(matcher, passage):
+    rng = random.Random(1)
+    spoken = [w for w in passage if rng.random() > 0.05]
+    spoken = [w if rng.random() > 0.05 else "zzz" for w in spoken]
+    for i in range(0, len(spoken), 40):
+        spoken.insert(i, "um")
+
+    banded = PassageAligner(matcher).align(passage, spoken)
+    full = PassageAligner(matcher, band=None).align(passage, spoken)
+    assert banded['matches'] == full['matches']
+    assert banded['score'] == pytest.approx(full['score'])
+
+
+def test_long_passage_aligns_within_budget(matcher):
+    rng = random.Random(2)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9)))
+             for _ in range(800)]
+    vocab += "the a and to of in was he she it said they".split() * 20
+    expected = [rng.choice(vocab) for _ in range(2000)]
+    noisy = [w if rng.random() > 0.1 else w[:-1] + "e" for w in expected if rng.random() > 0.05]
+    for i in range(0, len(noisy), 40):
+        noisy.insert(i, "um")
+
+    aligner = PassageAligner(matcher)
+    for spoken in (expected, noisy, expected[:1000]):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            result = aligner.align(expected, spoken)
+            best = min(best, time.perf_counter() - start)
+        assert best < 0.25
+    assert result['matches'] == 1000
+    assert result['omissions'] == 1000
@@ -0,0 +1,32 @@
+from services.hypothesis_tracker import HypothesisTracker
+
+
+def test_growing_partials_return_only_new_tail():
+    tracker = HypothesisTracker()
+    assert tracker.feed("the") == ["the"]
+    assert tracker.feed("the cat") == ["cat"]
+    assert tracker.feed("the cat sat") == ["sat"]
+
+
+def test_growing_last_token_is_returned_again():
+    tracker = HypothesisTracker()
+    assert tracker.feed("so beau") == ["so", "beau"]
+    assert tracker.feed("so beautiful") == ["beautiful"]
+
+
+def test_final_with_capitals_and_punctuation_adds_nothing():
+    tracker = HypothesisTracker()
+    tracker.feed("the cat sat")
+    assert tracker.feed("The cat sat.") == []
+
+
+def test_final_returns_only_words_missing_from_partials():
+    tracker = HypothesisTracker()
+    tracker.feed("the cat")
+    assert tracker.feed("The cat sat.") == ["sat"]
+
+
+def test_revised_word_is_returned():
+    tracker = HypothesisTracker()
+    tracker.feed("the cap sat")
+    assert tracker.feed("The cat sat.") == ["cat"]
@@ -0,0 +1,46 @@
+import asyncio
+
+from services.quiz_batch import QuizBatchJob
+from services.quiz_cache import QuizCache
+from services.quiz_generator import QuizGenerator
+
+QUIZ = [
+    {"question": f"Q{i}?", "options": ["a", "b", "c", "d"], "correct_answer": 0, "explanation": ""}
+    for i in range(5)
+]
+
+
+def run_job(answer, text="A short passage.", **generator_args):
+    async def run():
+        generator = QuizGenerator(openai_api_key="x", cache=QuizCache(), hedging=False, **generator_args)
+
+        async def call(*args, **kwargs):
+            return answer(*args)
+
+        generator.router.call = call
+        job = QuizBatchJob(generator, [{"id": "p", "text": text}], max_retries=1, backoff_s=0.0)
+        first = await job.run()
+        again = await QuizBatchJob(generator, [{"id": "p", "text": text}], max_retries=0).run()
+        return first, again
+
+    return asyncio.run(run())
+
+
+def test_valid_quiz_is_generated_then_cached():
+    first, again = run_job(lambda text, n, age: QUIZ)
+    assert (first["generated"], first["failed"]) == (1, 0)
+    assert (again["cached"], again["generated"]) == (1, 0)
+
+
+def test_invalid_last_resort_answer_is_not_reported_as_generated():
+    # HedgedRouter.call returns the last invalid answer when every provider fails validation
+    first, _ = run_job(lambda text, n, age: [{"question": "Q?", "options": ["a"], "correct_answer": 0}])
+    assert (first["generated"], first["failed"], first["retries"]) == (0, 1, 1)
+    assert first["errors"]["p"] == "generated quiz was incomplete or invalid"
+
+
+def test_short_chunked_quiz_is_not_reported_as_generated():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 60 for i in range(20))
+    first, _ = run_job(lambda chunk, n, age: QUIZ[:1] if chunk.startswith("Paragraph 0 ") else [],
+                       text=text, long_text_chars=2000, chunk_chars=1000)
+    assert (first["generated"], first["failed"]) == (0, 1)
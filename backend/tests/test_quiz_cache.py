@@ -0,0 +1,34 @@
+import asyncio
+
+from services.quiz_cache import QuizCache
+
+
+def quiz(n):
+    return [{"question": f"q{n}", "options": ["a", "b", "c", "d"], "correct_answer": 0}]
+
+
+def test_variants_survive_memory_eviction(tmp_path):
+    async def run():
+        cache = QuizCache(path=str(tmp_path / "quiz.db"), maxsize=1, variants=3)
+        await cache.put("a", quiz(0))
+        await cache.put("b", quiz(9))  # evicts "a" from memory
+        await cache.put("a", quiz(1))
+        await cache.put("b", quiz(8))
+        await cache.put("a", quiz(2))
+
+        reopened = QuizCache(path=str(tmp_path / "quiz.db"), variants=3)
+        served = [await reopened.get("a") for _ in range(3)]
+        assert sorted(q[0]["question"] for q in served) == ["q0", "q1", "q2"]
+
+    asyncio.run(run())
+
+
+def test_incomplete_variants_are_not_served(tmp_path):
+    async def run():
+        cache = QuizCache(path=str(tmp_path / "quiz.db"), variants=2)
+        await cache.put("a", quiz(0))
+        assert await cache.get("a") is None
+        await cache.put("a", quiz(1))
+        assert await cache.get("a") is not None
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+from services.quiz_chunks import select_questions, split_passage
+
+
+def question(stem):
+    return {"question": stem, "options": ["a", "b", "c", "d"], "correct_answer": 0}
+
+
+def test_malformed_candidates_are_dropped():
+    candidates = [
+        [question("Who found the map?"), {"question": None, "options": []}, "not a question"],
+        [{"options": ["a", "b", "c", "d"], "correct_answer": 1}, question("Where did Max go?")],
+        [question(42), question("   "), question("Why was the river cold?")],
+    ]
+    picked = select_questions(candidates, 3)
+    assert [q["question"] for q in picked] == [
+        "Who found the map?",
+        "Where did Max go?",
+        "Why was the river cold?",
+    ]
+
+
+def test_near_duplicates_are_dropped_across_chunks():
+    candidates = [
+        [question("What did Max find in the forest?")],
+        [question("What did Max find in the forest"), question("Who helped Max cross the river?")],
+    ]
+    picked = select_questions(candidates, 2)
+    assert [q["question"] for q in picked] == [
+        "What did Max find in the forest?",
+        "Who helped Max cross the river?",
+    ]
+
+
+def test_split_passage_keeps_chunks_under_the_limit():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 60 for i in range(20))
+    chunks = split_passage(text, 1000)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_long_passage_quiz_survives_a_malformed_chunk_answer():
+    import asyncio
+
+    from services.quiz_generator import QuizGenerator
+
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 60 for i in range(20))
+    answers = iter([
+        ["question options correct_answer", {"question": None}],
+        [question("Where did Max go?"), question("Who helped Max?")],
+        [question("Why was the river cold?"), question("What did Max find?")],
+    ])
+
+    async def call(chunk, per_chunk, age_group):
+        return next(answers, [])
+
+    async def run():
+        generator = QuizGenerator(openai_api_key="x", long_text_chars=2000, chunk_chars=1000)
+        generator.router.call = call
+        return await generator.generate_questions(text, num_questions=3)
+
+    picked = asyncio.run(run())
+    assert len(picked) == 3
+    assert all(isinstance(q["question"], str) for q in picked)
@@ -0,0 +1,47 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from services.quiz_generator import QuizGenerator
+
+QUESTIONS = [
+    {"question": f"Q{i}?", "options": ["a", "b", "c", "d"], "correct_answer": i % 4, "explanation": "e"}
+    for i in range(5)
+]
+BODY = json.dumps({"questions": QUESTIONS})
+
+
+def fake_openai(calls):
+    async def chunks():
+        for i in range(0, len(BODY), 16):
+            await asyncio.sleep(0.001)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=BODY[i:i + 16]))])
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return chunks()
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_identical_streams_share_one_call():
+    async def run():
+        calls = []
+        generator = QuizGenerator(openai_api_key="x")
+        generator.openai_client = fake_openai(calls)
+
+        async def consume():
+            return [q async for q in generator.stream_questions("a short story")]
+
+        streamed = await asyncio.gather(
+            consume(), consume(), generator.generate_questions("a short story")
+        )
+        assert streamed == [QUESTIONS, QUESTIONS, QUESTIONS]
+        assert len(calls) == 1
+        assert generator.stats()["collapsed"] == 2
+        assert generator.stats()["in_flight"] == 0
+
+        tracker = generator.router.trackers["openai"]
+        assert (tracker.calls, tracker.wins, tracker.samples) == (1, 1, 1)
+
+    asyncio.run(run())
@@ -0,0 +1,26 @@
+from services.reading_session import ReadingSession
+
+
+class Outbound:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, event):
+        self.sent.append(event)
+
+
+def test_backpressure_while_detached_is_kept_as_state_not_replayed():
+    session = ReadingSession("s")
+    first = Outbound()
+    session.attach(first)
+    session.send({"type": "backpressure", "paused": True})
+    assert session.paused and first.sent == [{"type": "backpressure", "paused": True}]
+
+    session.detach()
+    session.send({"type": "word_recognized", "index": 3})
+    session.send({"type": "backpressure", "paused": False})
+    assert session.paused is False
+
+    second = Outbound()
+    assert session.attach(second) == 1
+    assert second.sent == [{"type": "word_recognized", "index": 3}]
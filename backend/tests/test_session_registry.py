@@ -0,0 +1,29 @@
+import pytest
+
+from services.session_registry import InMemorySessionRegistry, SQLiteSessionRegistry, load_resumable
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def registry(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionRegistry()
+    return SQLiteSessionRegistry(str(tmp_path / "sessions.db"))
+
+
+def state(token):
+    return {"expected_words": ["a", "b"], "current_index": 1, "results": [], "resume_token": token}
+
+
+def test_resume_needs_the_sessions_token(registry):
+    registry.save("s1", state("secret"), ttl_s=60)
+    assert load_resumable(registry, "s1", "secret")["current_index"] == 1
+    assert load_resumable(registry, "s1", None) is None
+    assert load_resumable(registry, "s1", "") is None
+    assert load_resumable(registry, "s1", "guess") is None
+    assert load_resumable(registry, "unknown", "secret") is None
+
+
+def test_state_without_token_is_never_resumable(registry):
+    registry.save("s1", state(None), ttl_s=60)
+    assert load_resumable(registry, "s1", None) is None
+    assert load_resumable(registry, "s1", "") is None
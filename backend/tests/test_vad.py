@@ -0,0 +1,92 @@
+import numpy as np
+
+from services.vad import SAMPLE_RATE, VoiceActivityGate
+
+
+def tone(seconds: float) -> bytes:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 220 * t) * 12000).astype("<i2").tobytes()
+
+
+def test_speech_passes_unchanged():
+    out = []
+    gate = VoiceActivityGate(out.append)
+    audio = tone(0.5)
+    gate.process(audio)
+    assert b"".join(out) == audio
+
+
+def test_odd_byte_chunks_keep_sample_alignment():
+    out = []
+    gate = VoiceActivityGate(out.append)
+    audio = tone(0.5)
+    # Split at odd offsets: every chunk but the first starts mid-sample
+    for start in range(0, len(audio), 641):
+        gate.process(audio[start:start + 641])
+    assert b"".join(out) == audio
+    assert all(len(chunk) % 2 == 0 for chunk in out)
+
+
+def test_single_byte_is_held_for_next_chunk():
+    out = []
+    gate = VoiceActivityGate(out.append)
+    audio = tone(0.1)
+    gate.process(audio[:1])
+    assert out == []
+    gate.process(audio[1:])
+    assert b"".join(out) == audio
+
+
+def hum(seconds: float) -> bytes:
+    """Audible-to-no-one background (about -70 dBFS): classified as silence."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 50 * t) * 10).astype("<i2").tobytes()
+
+
+def seconds(n: float) -> int:
+    return int(SAMPLE_RATE * n) * 2
+
+
+def test_silence_after_hangover_and_keepalive_is_dropped():
+    out = []
+    gate = VoiceActivityGate(out.append, hangover_ms=300, keepalive_ms=800)
+    speech, silence = tone(0.5), hum(3.0)
+    gate.process(speech + silence)
+
+    forwarded = b"".join(out)
+    # Speech, then the hangover as recorded, then keep-alive digital silence
+    assert len(forwarded) == seconds(0.5 + 0.3 + 0.8)
+    assert forwarded[:len(speech) + seconds(0.3)] == speech + silence[:seconds(0.3)]
+    assert forwarded[len(speech) + seconds(0.3):] == bytes(seconds(0.8))
+    assert gate.frames_dropped == (3000 - 300 - 800) // 20
+
+    # Further silence is not forwarded at all
+    out.clear()
+    gate.process(hum(1.0))
+    assert out == []
+
+
+def test_preroll_is_released_when_speech_starts():
+    out = []
+    gate = VoiceActivityGate(out.append, preroll_ms=200, keepalive_ms=0)
+    silence, speech = hum(1.0), tone(0.3)
+    gate.process(silence)
+    assert out == []
+
+    gate.process(speech)
+    assert b"".join(out) == silence[-seconds(0.2):] + speech
+    assert gate.frames_dropped == (1000 - 200) // 20
+
+
+def test_seconds_saved_counts_partial_frames():
+    out = []
+    gate = VoiceActivityGate(out.append, preroll_ms=200, keepalive_ms=0)
+    # 50 full 20 ms frames and a 10 ms partial one
+    gate.process(hum(1.01))
+    assert gate.seconds_saved == 1.01
+    assert gate.stats()["seconds_saved"] == 1.01
+
+    # Pre-roll handed back to the recognizer is no longer saved: the last
+    # ten frames, i.e. nine full ones and the partial one
+    gate.process(tone(0.2))
+    assert abs(gate.seconds_saved - (1.01 - 0.19)) < 1e-9
@@ -0,0 +1,65 @@
+import random
+
+import jellyfish
+import numpy as np
+
+from services.word_matcher import WordMatcher, _mra_comparison
+
+# ASCII letters plus accented, Greek, Cyrillic, CJK and characters whose
+# upper case changes length (ß, ligatures, dotted İ)
+ALPHABET = "abcdeiouknmstwxq" + "éüñøßαβжщ中ﬁİ"
+
+
+def random_words(rng, count):
+    return ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 9))) for _ in range(count)]
+
+
+def codex(word):
+    try:
+        return jellyfish.match_rating_codex(word)
+    except ValueError:
+        return None
+
+
+def test_mra_comparison_matches_jellyfish_on_unicode_words():
+    rng = random.Random(7)
+    words = random_words(rng, 4000)
+    for a, b in zip(words[::2], words[1::2]):
+        try:
+            expected = bool(jellyfish.match_rating_comparison(a, b))
+        except ValueError:
+            expected = False
+        assert _mra_comparison(codex(a), codex(b)) == expected, (a, b)
+
+
+def test_non_ascii_scores_match_the_unbatched_matcher():
+    assert WordMatcher(threshold=0.85).match("éménw", "éméne") == (False, 0.8)
+    is_match, confidence = WordMatcher(threshold=0.55).match("ikq", "iéeoxj")
+    assert is_match and abs(confidence - 2 / 3) < 1e-9
+
+
+def test_match_many_agrees_with_match():
+    # Scalar rejections may report the bound that proved them, so scores
+    # are only compared for accepted matches
+    rng = random.Random(11)
+    expected = random_words(rng, 500) + ["adventure", "said", "house"]
+    spoken = random_words(rng, 500) + ["adventur", "sed", "mouse"]
+    matcher = WordMatcher(threshold=0.6)
+    is_match, confidence = matcher.match_many(expected, spoken)
+    for k, (e, s) in enumerate(zip(expected, spoken)):
+        ok, score = matcher.match(e, s)
+        assert bool(is_match[k]) == ok, (e, s)
+        if ok:
+            assert np.isclose(confidence[k], score), (e, s)
+
+
+def test_vectorized_mra_matches_scalar():
+    from services.word_matcher import _mra_comparison_many
+
+    rng = random.Random(3)
+    codexes = [codex(w) for w in random_words(rng, 600)] + [None, ""]
+    left = np.repeat(np.arange(len(codexes)), 40)
+    right = np.array([rng.randrange(len(codexes)) for _ in range(len(left))])
+    batched = _mra_comparison_many(codexes, left, right)
+    for k in range(len(left)):
+        assert batched[k] == _mra_comparison(codexes[left[k]], codexes[right[k]])
@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react'
 import { useParams, useRouter } from 'next/navigation'
 import { Brain } from 'lucide-react'
 import Quiz from '@/components/Quiz'
+import { streamQuiz } from '@/lib/quizStream'
 
 // Sample reading texts (same as reading page)
 const readingTexts: { [key: string]: string } = {
@@ -28,40 +29,45 @@ export default function QuizPage() {
 
   const [questions, setQuestions] = useState<QuizQuestion[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
   useEffect(() => {
     // Extract textId from sessionId (format: session-textId-timestamp)
     // For demo, we'll use a simplified approach
     const loadQuiz = async () => {
+      let received = 0
       try {
         // In a real app, we would fetch the text based on the session
         // For now, let's use the first text as a demo
         const textId = 'adventure-forest' // You'd extract this from session data
         const text = readingTexts[textId]
 
-        // Call backend API to generate quiz
-        const response = await fetch('http://localhost:8000/api/generate-quiz', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            text: text,
-            session_id: sessionId
-          })
-        })
+        // Stream questions from the backend; show the first one as soon as it arrives
+        await streamQuiz(
+          'http://localhost:8000/api/generate-quiz/stream',
+          { text: text, session_id: sessionId },
+          (question) => {
+            received += 1
+            setQuestions((prev) => [...prev, question])
+            setLoading(false)
+          }
+        )
 
-        if (!response.ok) {
+        if (received === 0) {
           throw new Error('Failed to generate quiz')
         }
-
-        const data = await response.json()
-        setQuestions(data.questions)
-        setLoading(false)
+        setLoadingMore(false)
 
       } catch (err) {
         console.error('Error loading quiz:', err)
+        setLoadingMore(false)
+
+        // Keep the questions that already arrived
+        if (received > 0) {
+          return
+        }
+
         setError('Could not load quiz. Using sample questions instead.')
 
         // Fallback to sample questions
@@ -141,7 +147,7 @@ export default function QuizPage() {
         </div>
       )}
 
-      <Quiz questions={questions} onComplete={handleQuizComplete} />
+      <Quiz questions={questions} loadingMore={loadingMore} onComplete={handleQuizComplete} />
     </div>
   )
 }
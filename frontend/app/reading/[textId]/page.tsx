@@ -118,6 +118,19 @@ export default function ReadingPage() {
     }
   }
 
+  const handleSkip = (index: number) => {
+    // Reader moved past this word without saying it; keep going
+    setWords(prevWords => {
+      const newWords = [...prevWords]
+      if (index < newWords.length && newWords[index].status === 'pending') {
+        newWords[index] = { ...newWords[index], status: 'error' }
+      }
+      return newWords
+    })
+    setCurrentWordIndex(index + 1)
+    setCorrectStreak(0)
+  }
+
   const handleComplete = () => {
     setIsComplete(true)
     setIsRecording(false)
@@ -221,6 +234,7 @@ export default function ReadingPage() {
 
         <AudioRecorder
           onTranscript={handleTranscript}
+          onSkip={handleSkip}
           onComplete={handleComplete}
           expectedWords={words.map(w => w.text)}
           isRecording={isRecording}
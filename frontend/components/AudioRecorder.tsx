@@ -2,9 +2,11 @@
 
 import { useState, useRef, useEffect } from 'react'
 import { Mic, Pause } from 'lucide-react'
+import { BINARY_PROTOCOL, decodeEvents } from '@/lib/binaryProtocol'
 
 interface AudioRecorderProps {
   onTranscript: (word: string, index: number) => void
+  onSkip?: (index: number) => void
   onComplete: () => void
   expectedWords: string[]
   isRecording: boolean
@@ -23,8 +25,12 @@ function makeWsUrl(path: string) {
   return `${wsScheme}//${hostname}${finalPort ? ':' + finalPort : ''}${path}`
 }
 
+// Backoff 0.5s, 1s, 2s, 4s, 8s: stays within the server's resume grace window
+const MAX_RECONNECT_ATTEMPTS = 5
+
 export default function AudioRecorder({
   onTranscript,
+  onSkip,
   onComplete,
   expectedWords,
   isRecording,
@@ -38,6 +44,17 @@ export default function AudioRecorder({
   const streamRef = useRef<MediaStream | null>(null)
   const wsRef = useRef<WebSocket | null>(null)
   const currentWordIndexRef = useRef(0)
+  const audioPausedRef = useRef(false)
+  // Server session id; sent again on restart so reading continues from the
+  // last confirmed word, whichever backend worker picks up the connection
+  const sessionIdRef = useRef<string | null>(null)
+  const resumeTokenRef = useRef<string | null>(null)
+  const stoppingRef = useRef(false)
+  // Id of the passage the server already has; reconnects send it instead
+  // of the whole word list
+  const passageIdRef = useRef<string | null>(null)
+  const passageKeyRef = useRef<string | null>(null)
+  const reconnectAttemptsRef = useRef(0)
 
   // Stop on unmount / tab close
   useEffect(() => {
@@ -62,10 +79,112 @@ export default function AudioRecorder({
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [])
 
+  function connect() {
+    const ws = new WebSocket(makeWsUrl('/ws/recognize'))
+    ws.binaryType = 'arraybuffer'
+    wsRef.current = ws
+    // Spoken-token table of the binary protocol, scoped to this socket
+    const tokens: string[] = []
+
+    // Binary event frames are requested; the server answers with the
+    // protocol it chose, and JSON text frames are handled either way
+    const sendStart = (withWords: boolean) => {
+      ws.send(
+        JSON.stringify({
+          type: 'start',
+          ...(withWords ? { expectedWords } : { passageId: passageIdRef.current }),
+          sessionId: sessionIdRef.current,
+          resumeToken: resumeTokenRef.current,
+          protocol: BINARY_PROTOCOL
+        })
+      )
+    }
+
+    ws.onopen = () => {
+      const passageKey = expectedWords.join('\n')
+      if (passageKeyRef.current !== passageKey) {
+        // Different passage than the one the id was issued for
+        passageIdRef.current = null
+        passageKeyRef.current = passageKey
+      }
+      sendStart(!(passageIdRef.current && sessionIdRef.current))
+    }
+
+    const handleEvent = (data: any) => {
+      if (data.type === 'ready') {
+        // ready to receive PCM16 frames
+        sessionIdRef.current = data.sessionId ?? null
+        resumeTokenRef.current = data.resumeToken ?? null
+        passageIdRef.current = data.passageId ?? null
+        currentWordIndexRef.current = data.resumeIndex ?? 0
+        // Pause/resume events sent while we were away are not replayed
+        audioPausedRef.current = !!data.paused
+        reconnectAttemptsRef.current = 0
+        setError(null)
+      } else if (data.type === 'passage_required') {
+        // Server doesn't know the passage id (e.g. another worker)
+        passageIdRef.current = null
+        sendStart(true)
+      } else if (data.type === 'word_recognized') {
+        onTranscript(data.word, data.index)
+        currentWordIndexRef.current = data.index + 1
+        if ('vibrate' in navigator) navigator.vibrate(40)
+        if (data.index >= expectedWords.length - 1) {
+          onComplete()
+          stopRecording()
+        }
+      } else if (data.type === 'word_skipped') {
+        onSkip?.(data.index)
+        currentWordIndexRef.current = data.index + 1
+      } else if (data.type === 'backpressure') {
+        // Server recognizer is behind; hold audio until it catches up
+        audioPausedRef.current = !!data.paused
+      } else if (data.type === 'words_recognized') {
+        // Several word events coalesced into one frame, in order
+        for (const e of data.events || []) handleEvent(e)
+      } else if (data.type === 'error') {
+        setError(data.message || 'Recognition error')
+      }
+    }
+
+    ws.onmessage = (event) => {
+      try {
+        if (event.data instanceof ArrayBuffer) {
+          for (const e of decodeEvents(event.data, tokens)) handleEvent(e)
+          return
+        }
+        handleEvent(JSON.parse(event.data))
+      } catch {
+        // ignore non-JSON (shouldn't happen here)
+      }
+    }
+
+    ws.onerror = () => {
+      setError('WebSocket error. Is the backend running?')
+    }
+
+    ws.onclose = () => {
+      if (wsRef.current !== ws) return
+      if (!stoppingRef.current && reconnectAttemptsRef.current < MAX_RECONNECT_ATTEMPTS) {
+        // Dropped mid-reading: the server holds the session for a short
+        // grace window, so reconnect and pick up where we left off
+        const delay = 500 * 2 ** reconnectAttemptsRef.current
+        reconnectAttemptsRef.current += 1
+        setError('Connection lost. Reconnecting...')
+        setTimeout(() => {
+          if (!stoppingRef.current) connect()
+        }, delay)
+        return
+      }
+      setIsRecording(false)
+    }
+  }
+
   async function startRecording() {
     try {
       setError(null)
       currentWordIndexRef.current = 0
+      audioPausedRef.current = false
 
       // 1) Mic
       const stream = await navigator.mediaDevices.getUserMedia({
@@ -78,42 +197,10 @@ export default function AudioRecorder({
       })
       streamRef.current = stream
 
-      // 2) WS
-      const ws = new WebSocket(makeWsUrl('/ws/recognize'))
-      wsRef.current = ws
-
-      ws.onopen = () => {
-        ws.send(JSON.stringify({ type: 'start', expectedWords }))
-      }
-
-      ws.onmessage = (event) => {
-        try {
-          const data = JSON.parse(event.data)
-          if (data.type === 'ready') {
-            // ready to receive PCM16 frames
-          } else if (data.type === 'word_recognized') {
-            onTranscript(data.word, data.index)
-            currentWordIndexRef.current = data.index + 1
-            if ('vibrate' in navigator) navigator.vibrate(40)
-            if (data.index >= expectedWords.length - 1) {
-              onComplete()
-              stopRecording()
-            }
-          } else if (data.type === 'error') {
-            setError(data.message || 'Recognition error')
-          }
-        } catch {
-          // ignore non-JSON (shouldn't happen here)
-        }
-      }
-
-      ws.onerror = () => {
-        setError('WebSocket error. Is the backend running?')
-      }
-
-      ws.onclose = () => {
-        setIsRecording(false)
-      }
+      // 2) WS (reconnects on network blips and resumes the same session)
+      stoppingRef.current = false
+      reconnectAttemptsRef.current = 0
+      connect()
 
       // 3) AudioContext + Worklet
       const ctx = new (window.AudioContext || (window as any).webkitAudioContext)()
@@ -138,6 +225,7 @@ export default function AudioRecorder({
         const buf = e.data as ArrayBuffer
         const sock = wsRef.current
         if (!sock || sock.readyState !== WebSocket.OPEN) return
+        if (audioPausedRef.current) return // server asked us to pause
         if (sock.bufferedAmount > 512 * 1024) return // drop when >512KB queued
         sock.send(buf)
       }
@@ -152,6 +240,7 @@ export default function AudioRecorder({
   }
 
   function stopRecording() {
+    stoppingRef.current = true
     try {
       workletNodeRef.current?.disconnect()
       workletNodeRef.current = null
@@ -164,6 +253,8 @@ export default function AudioRecorder({
       if (ws && ws.readyState === WebSocket.OPEN) {
         ws.send(JSON.stringify({ type: 'stop' }))
         ws.close()
+      } else if (ws) {
+        ws.close() // still (re)connecting
       }
       wsRef.current = null
     } finally {
@@ -13,10 +13,11 @@ interface QuizQuestion {
 
 interface QuizProps {
   questions: QuizQuestion[]
+  loadingMore?: boolean // more questions are still streaming in
   onComplete: (score: number) => void
 }
 
-export default function Quiz({ questions, onComplete }: QuizProps) {
+export default function Quiz({ questions, loadingMore = false, onComplete }: QuizProps) {
   const [currentQuestion, setCurrentQuestion] = useState(0)
   const [selectedAnswer, setSelectedAnswer] = useState<number | null>(null)
   const [showFeedback, setShowFeedback] = useState(false)
@@ -57,7 +58,7 @@ export default function Quiz({ questions, onComplete }: QuizProps) {
       setCurrentQuestion(currentQuestion + 1)
       setSelectedAnswer(null)
       setShowFeedback(false)
-    } else {
+    } else if (!loadingMore) {
       // Quiz complete
       onComplete(score)
     }
@@ -74,6 +75,8 @@ export default function Quiz({ questions, onComplete }: QuizProps) {
   const currentQ = questions[currentQuestion]
   const isCorrect = selectedAnswer === currentQ.correct_answer
   const progress = ((currentQuestion + 1) / questions.length) * 100
+  const hasNext = currentQuestion < questions.length - 1
+  const waitingForNext = !hasNext && loadingMore
 
   return (
     <div className="max-w-4xl mx-auto space-y-6">
@@ -81,7 +84,7 @@ export default function Quiz({ questions, onComplete }: QuizProps) {
       <div className="bg-white rounded-2xl shadow-lg p-6">
         <div className="flex items-center justify-between mb-3">
           <span className="text-xl font-semibold text-gray-700">
-            Question {currentQuestion + 1} of {questions.length}
+            Question {currentQuestion + 1} of {questions.length}{loadingMore ? '+' : ''}
           </span>
           <span className="text-xl font-semibold text-purple-600">
             Score: {score}/{questions.length}
@@ -191,9 +194,14 @@ export default function Quiz({ questions, onComplete }: QuizProps) {
           ) : (
             <button
               onClick={handleNext}
-              className="px-12 py-4 bg-blue-500 hover:bg-blue-600 text-white rounded-full text-2xl font-bold shadow-lg hover:scale-105 transition-all"
+              disabled={waitingForNext}
+              className={`px-12 py-4 rounded-full text-2xl font-bold transition-all ${
+                waitingForNext
+                  ? 'bg-gray-300 text-gray-500 cursor-wait'
+                  : 'bg-blue-500 hover:bg-blue-600 text-white shadow-lg hover:scale-105'
+              }`}
             >
-              {currentQuestion < questions.length - 1 ? 'Next Question →' : 'See Results'}
+              {hasNext ? 'Next Question →' : waitingForNext ? 'Loading next question...' : 'See Results'}
             </button>
           )}
         </div>
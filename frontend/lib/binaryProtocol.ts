@@ -0,0 +1,55 @@
+/**
+ * Decoder for the compact binary event frames of /ws/recognize
+ * (see backend/services/binary_protocol.py for the layout)
+ */
+
+export const BINARY_PROTOCOL = 'binary'
+
+const RECORD_BYTES = 8
+const WORD_RECOGNIZED = 1
+const WORD_SKIPPED = 2
+const BACKPRESSURE = 3
+const TOKEN = 4
+
+const utf8 = new TextDecoder()
+
+function float16ToNumber(h: number): number {
+  const sign = h & 0x8000 ? -1 : 1
+  const exp = (h >> 10) & 0x1f
+  const frac = h & 0x3ff
+  if (exp === 0) return sign * 2 ** -14 * (frac / 1024)
+  if (exp === 0x1f) return frac ? NaN : sign * Infinity
+  return sign * 2 ** (exp - 15) * (1 + frac / 1024)
+}
+
+/**
+ * Decode one binary frame into the same event objects the JSON protocol
+ * sends. `tokens` is the spoken-token table; keep one per WebSocket.
+ */
+export function decodeEvents(buffer: ArrayBuffer, tokens: string[]): any[] {
+  const view = new DataView(buffer)
+  const events: any[] = []
+  let offset = 0
+
+  while (offset + RECORD_BYTES <= buffer.byteLength) {
+    const kind = view.getUint8(offset)
+    const flags = view.getUint8(offset + 1)
+    const index = view.getUint16(offset + 2, true)
+    const token = view.getUint16(offset + 4, true)
+    const confidence = float16ToNumber(view.getUint16(offset + 6, true))
+    offset += RECORD_BYTES
+
+    if (kind === TOKEN) {
+      // `index` holds the byte length of the token text
+      tokens[token] = utf8.decode(new Uint8Array(buffer, offset, index))
+      offset += index
+    } else if (kind === WORD_RECOGNIZED) {
+      events.push({ type: 'word_recognized', index, word: tokens[token] ?? '', confidence })
+    } else if (kind === WORD_SKIPPED) {
+      events.push({ type: 'word_skipped', index })
+    } else if (kind === BACKPRESSURE) {
+      events.push({ type: 'backpressure', paused: (flags & 1) === 1 })
+    }
+  }
+  return events
+}
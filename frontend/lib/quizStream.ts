@@ -0,0 +1,74 @@
+/**
+ * Client for /api/generate-quiz/stream: reads the Server-Sent Events
+ * response and hands over each question as soon as it arrives
+ */
+
+export interface StreamedQuestion {
+  question: string
+  options: string[]
+  correct_answer: number
+  explanation?: string
+}
+
+/**
+ * POST `body` to the streaming endpoint and call `onQuestion` per question.
+ * Resolves with the number of questions received; rejects on a server
+ * `error` event or a failed request.
+ */
+export async function streamQuiz(
+  url: string,
+  body: unknown,
+  onQuestion: (question: StreamedQuestion) => void
+): Promise<number> {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify(body),
+  })
+
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to generate quiz')
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let count = 0
+
+  const handleEvent = (block: string) => {
+    let event = 'message'
+    const data: string[] = []
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim()
+      else if (line.startsWith('data:')) data.push(line.slice(5).trimStart())
+    }
+    if (data.length === 0) return
+    const payload = JSON.parse(data.join('\n'))
+
+    if (event === 'question') {
+      count += 1
+      onQuestion(payload)
+    } else if (event === 'error') {
+      throw new Error(payload.message || 'Failed to generate quiz')
+    }
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n')
+
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      handleEvent(buffer.slice(0, boundary))
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+  if (buffer.trim()) handleEvent(buffer)
+
+  return count
+}